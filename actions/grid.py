@@ -0,0 +1,142 @@
+import logging
+import re
+import time
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+from playwright.sync_api import Page
+
+import metrics
+from actions.utils import expect_graphql_response
+
+logger = logging.getLogger()
+
+T = TypeVar("T")
+
+# ag-grid renders pinned and centre columns in separate containers, so cells
+# are merged by the row-index attribute rather than by DOM order
+_READ_GRID = """
+root => {
+    const rows = {};
+    for (const row of root.querySelectorAll('.ag-row[row-index]')) {
+        const index = Number(row.getAttribute('row-index'));
+        const cells = rows[index] || (rows[index] = {});
+        for (const cell of row.querySelectorAll('[col-id]')) {
+            cells[cell.getAttribute('col-id')] = cell.textContent.trim();
+        }
+    }
+    return Object.keys(rows)
+        .map(Number)
+        .sort((a, b) => a - b)
+        .map(index => rows[index]);
+}
+"""
+
+_READ_ROWS = """
+(rows, cellSelector) => rows.map(
+    row => Array.from(row.querySelectorAll(cellSelector), cell => cell.textContent.trim())
+)
+"""
+
+_READ_KEY_VALUES = """
+rows => rows.map(row => [
+    (row.querySelector('dt') || {}).textContent || '',
+    (row.querySelector('dd') || {}).textContent || '',
+])
+"""
+
+
+# Cell text of every rendered row of the ag-grid under selector, by col-id
+def read_grid(page: Page, selector: str) -> List[Dict[str, str]]:
+    with metrics.timer("grid.read"):
+        return page.locator(selector).first.evaluate(_READ_GRID)
+
+
+def read_rows(page: Page, row_selector: str, cell_selector: str) -> List[List[str]]:
+    with metrics.timer("grid.read"):
+        return page.locator(row_selector).evaluate_all(_READ_ROWS, cell_selector)
+
+
+def read_key_values(
+    page: Page, row_test_id: str = "key-value-table-row"
+) -> List[Tuple[str, str]]:
+    with metrics.timer("grid.read"):
+        rows = page.get_by_test_id(row_test_id).evaluate_all(_READ_KEY_VALUES)
+    return [(name, value) for name, value in rows]
+
+
+def to_number(text: str) -> float:
+    return float(text.replace(",", ""))
+
+
+def numeric_rows(rows: List[List[str]]) -> List[List[float]]:
+    return [[to_number(cell) for cell in row] for row in rows]
+
+
+def matches(expected: str, actual: str) -> bool:
+    # Patterns starting with \d are regexes, e.g. so that dates can be matched
+    # in any timezone. Anything else has to appear as is.
+    if re.match(r"^\\d", expected):
+        return re.search(expected, actual) is not None
+    return re.search(re.escape(expected), actual) is not None
+
+
+def assert_matches(expected_patterns: List[str], actual: str):
+    for expected in expected_patterns:
+        if not matches(expected, actual):
+            logger.info(f"Not Matched: {expected} != {actual}")
+            raise AssertionError(f"Pattern does not match: {expected} != {actual}")
+        logger.info(f"Matched: {expected} == {actual}")
+
+
+def assert_cells_equal(expected: List[list], actual: List[list]):
+    assert len(actual) >= len(expected), f"Expected {len(expected)} rows: {actual}"
+    for row_index, expected_row in enumerate(expected):
+        actual_row = actual[row_index][: len(expected_row)]
+        assert actual_row == expected_row, f"Row {row_index}: {actual_row}"
+
+
+# Re-reads until two consecutive reads agree and check passes on them. The
+# last assertion is raised if that hasn't happened within timeout ms.
+def until_stable(
+    page: Page,
+    read: Callable[[], T],
+    check: Optional[Callable[[T], None]] = None,
+    timeout: float = 5000,
+    interval: float = 100,
+) -> T:
+    deadline = time.perf_counter() + timeout / 1000
+    previous = read()
+    while True:
+        page.wait_for_timeout(interval)
+        current = read()
+        timed_out = time.perf_counter() > deadline
+        if current == previous or timed_out:
+            try:
+                if check is not None:
+                    check(current)
+                return current
+            except AssertionError:
+                if timed_out:
+                    raise
+        previous = current
+
+
+def verify_data_grid(page: Page, data_test_id: str, expected_pattern: List[str]):
+    # Required so that we can get liquidation price
+    if data_test_id == "Positions":
+        with expect_graphql_response(page, "EstimatePosition"):
+            page.get_by_test_id(data_test_id).click()
+    else:
+        page.get_by_test_id(data_test_id).click()
+    selector = (
+        f'[data-testid^="tab-{data_test_id.lower()}"] >> .ag-center-cols-container'
+    )
+    page.locator(f"{selector} .ag-row-first").wait_for(state="visible")
+
+    # Every expected cell has to appear in the first row
+    def first_row_text() -> str:
+        rows = read_grid(page, selector)
+        return "".join(rows[0].values()) if rows else ""
+
+    until_stable(page, first_row_text, partial(assert_matches, expected_pattern))
@@ -0,0 +1,86 @@
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from vega_sim.null_service import VegaServiceNull
+
+import metrics
+
+logger = logging.getLogger()
+
+# Per-environment cache of data node lookups. Asset and market ids are cached
+# for as long as no block is produced: the null chain only moves when forward
+# is called, so counting those calls is enough to know when the cached answers
+# may be stale, without asking anyone for the block height. Public keys never
+# change once a key exists and are kept for the life of the environment.
+
+# log_dir -> number of forward calls, standing in for the block height
+_heights: Dict[str, int] = {}
+# log_dir -> (height the entries were read at, entries)
+_entries: Dict[str, Tuple[int, Dict[tuple, Any]]] = {}
+_keys: Dict[str, Dict[tuple, str]] = {}
+
+
+def track_blocks(vega: VegaServiceNull):
+    forward = vega.forward
+
+    def tracked_forward(*args, **kwargs):
+        try:
+            return forward(*args, **kwargs)
+        finally:
+            _heights[vega.log_dir] = _heights.get(vega.log_dir, 0) + 1
+
+    vega.forward = tracked_forward
+
+
+def _cached(vega: VegaServiceNull, key: tuple, load: Callable[[], Any]) -> Any:
+    height = _heights.get(vega.log_dir, 0)
+    cached_height, entries = _entries.get(vega.log_dir, (None, {}))
+    if cached_height != height:
+        entries = {}
+        _entries[vega.log_dir] = (height, entries)
+    if key in entries:
+        metrics.increment("lookup.hit")
+        return entries[key]
+    metrics.increment("lookup.miss")
+    value = load()
+    # Something that doesn't exist yet may well exist after the next block
+    if value is not None:
+        entries[key] = value
+    return value
+
+
+def asset_id(vega: VegaServiceNull, symbol: str) -> Optional[str]:
+    return _cached(vega, ("asset", symbol), lambda: vega.find_asset_id(symbol=symbol))
+
+
+def market_id(vega: VegaServiceNull, name: str) -> Optional[str]:
+    return _cached(vega, ("market", name), lambda: vega.find_market_id(name))
+
+
+def market_exists(vega: VegaServiceNull, market_id: str) -> bool:
+    exists = _cached(
+        vega,
+        ("market_exists", market_id),
+        lambda: any(market.id == market_id for market in vega.all_markets()) or None,
+    )
+    return bool(exists)
+
+
+def public_key(
+    vega: VegaServiceNull, key_name: str, wallet_name: Optional[str] = None
+) -> str:
+    keys = _keys.setdefault(vega.log_dir, {})
+    if (wallet_name, key_name) in keys:
+        metrics.increment("lookup.hit")
+    else:
+        metrics.increment("lookup.miss")
+        keys[(wallet_name, key_name)] = vega.wallet.public_key(
+            name=key_name, wallet_name=wallet_name
+        )
+    return keys[(wallet_name, key_name)]
+
+
+def forget(vega: VegaServiceNull):
+    _heights.pop(vega.log_dir, None)
+    _entries.pop(vega.log_dir, None)
+    _keys.pop(vega.log_dir, None)
@@ -1,10 +1,23 @@
+import logging
+import math
+import time
 from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timezone
 
-from playwright.sync_api import Page
+import vega_sim.api.faucet as faucet
+from playwright.sync_api import Page, Response, TimeoutError
+from vega_sim.api.helpers import num_to_padded_int
 from vega_sim.null_service import VegaServiceNull
-from typing import Optional
+from typing import Dict, List, Optional, Union
+
+import metrics
+from actions import lookup
+
+logger = logging.getLogger()
 
 WalletConfig = namedtuple("WalletConfig", ["name", "passphrase"])
+Party = namedtuple("Party", ["name", "public_key"])
 ASSET_NAME = "tDAI"
 
 def wait_for_toast_confirmation(page: Page, timeout: int = 30000):
@@ -13,25 +26,218 @@ def wait_for_toast_confirmation(page: Page, timeout: int = 30000):
     document.querySelector('[data-testid="toast-content"]').innerText.includes('AWAITING CONFIRMATION')
     """, timeout=timeout)
 
+def _is_graphql_operation(response: Response, operation_name: str) -> bool:
+    request = response.request
+    if request.method != "POST" or "graphql" not in request.url:
+        return False
+    try:
+        body = request.post_data_json
+    except Exception:
+        return False
+    # Tests name operations after either the query or its data field
+    return (
+        isinstance(body, dict)
+        and str(body.get("operationName")).lower() == operation_name.lower()
+    )
+
+def _graphql_data(response: Response, operation_name: str, start: float):
+    metrics.observe("graphql.wait", time.perf_counter() - start)
+    timing = response.request.timing
+    if timing["responseEnd"] > 0:
+        metrics.observe(f"graphql.{operation_name}", timing["responseEnd"] / 1000)
+    payload = response.json()
+    return payload.get("data") if payload else None
+
+class GraphQLResult:
+    data = None
+
+# Waits for the response to a query triggered inside the block, listening from
+# before the action so a fast response isn't missed:
+#   with expect_graphql_response(page, "stopOrders"):
+#       page.get_by_test_id("Stop orders").click()
+# The timeout starts once the block is done, as actions like settle can take
+# longer than the query. Like the old fixed sleep, not getting a response
+# within it is not an error.
+@contextmanager
+def expect_graphql_response(page: Page, operation_name: str, timeout: int = 5000):
+    result = GraphQLResult()
+    responses = []
+    def is_operation(response: Response) -> bool:
+        return _is_graphql_operation(response, operation_name)
+    def on_response(response: Response):
+        if is_operation(response):
+            responses.append(response)
+    page.on("response", on_response)
+    try:
+        yield result
+        start = time.perf_counter()
+        if not responses:
+            try:
+                responses.append(
+                    page.wait_for_event("response", is_operation, timeout=timeout)
+                )
+            except TimeoutError:
+                metrics.increment("graphql.timeout")
+                logger.debug(f"No {operation_name} response within {timeout}ms")
+                return
+        result.data = _graphql_data(responses[0], operation_name, start)
+    finally:
+        page.remove_listener("response", on_response)
+
 def create_and_faucet_wallet(
     vega: VegaServiceNull,
     wallet: WalletConfig,
     symbol: Optional[str] = None,
     amount: float = 1e4,
 ):
-    asset_id = vega.find_asset_id(symbol=symbol if symbol is not None else ASSET_NAME)
+    asset_id = lookup.asset_id(vega, symbol if symbol is not None else ASSET_NAME)
     vega.create_key(wallet.name)
     vega.mint(wallet.name, asset_id, amount)
 
-def next_epoch(vega: VegaServiceNull):
-    forwards = 0
-    epoch_seq = vega.statistics().epoch_seq
-    while epoch_seq == vega.statistics().epoch_seq:
+# Sends a faucet mint without vega.mint's block advance and balance polling,
+# the next block confirms it
+def faucet_mint(vega: VegaServiceNull, public_key: str, asset_id: str, amount: float):
+    faucet.mint(
+        public_key,
+        asset_id,
+        num_to_padded_int(amount, vega.asset_decimals[asset_id]),
+        faucet_url=vega.faucet_url,
+    )
+
+# Creates keys in the default wallet, either the given names or n keys named
+# "<prefix>0".."<prefix>{n-1}", and funds each of them with `assets`
+# ({symbol: amount}), all mints confirmed by a single settle
+def provision_parties(
+    vega: VegaServiceNull,
+    parties: Union[int, List[str]],
+    assets: Optional[Dict[str, float]] = None,
+    prefix: str = "party_",
+) -> List[Party]:
+    names = (
+        [f"{prefix}{index}" for index in range(parties)]
+        if isinstance(parties, int)
+        else parties
+    )
+    provisioned = []
+    with metrics.timer("parties.create"):
+        for name in names:
+            vega.create_key(name)
+            provisioned.append(Party(name, lookup.public_key(vega, name)))
+    if assets:
+        for symbol, amount in assets.items():
+            asset_id = lookup.asset_id(vega, symbol)
+            for party in provisioned:
+                faucet_mint(vega, party.public_key, asset_id, amount)
+        settle(vega)
+    return provisioned
+
+def next_epoch(vega: VegaServiceNull, epochs: int = 1):
+    stats = vega.statistics()
+    _advance_to_epoch(vega, stats, stats.epoch_seq + epochs)
+    vega.wait_for_total_catchup()
+
+# Moves chain time to the start of an epoch or to a timestamp (seconds since the
+# unix epoch, or a datetime) in one forward, instead of a block at a time
+def advance_to(
+    vega: VegaServiceNull,
+    epoch: Optional[int] = None,
+    timestamp: Optional[Union[float, datetime]] = None,
+):
+    if (epoch is None) == (timestamp is None):
+        raise ValueError("advance_to needs exactly one of epoch or timestamp")
+    stats = vega.statistics()
+    if epoch is not None:
+        _advance_to_epoch(vega, stats, epoch)
+    else:
+        target = (
+            timestamp.timestamp() if isinstance(timestamp, datetime) else timestamp
+        )
+        with metrics.timer("advance.wall"):
+            _forward_to(vega, stats, target)
+    vega.wait_for_total_catchup()
+
+def _advance_to_epoch(vega: VegaServiceNull, stats, epoch: int):
+    if epoch <= stats.epoch_seq:
+        return
+    # Every epoch lasts validators.epoch.length, the current one tells us how long
+    expiry = _to_seconds(stats.epoch_expiry_time)
+    length = expiry - _to_seconds(stats.epoch_start_time)
+    with metrics.timer("advance.wall"):
+        _forward_to(vega, stats, expiry + (epoch - stats.epoch_seq - 1) * length)
+        # The epoch changes in the first block at or after its expiry, which the
+        # forward ends with; the next one makes sure the change is processed
         vega.wait_fn(1)
-        forwards += 1
-        if forwards > 2 * 10 * 60:
-            raise Exception(
-                "Epoch not started after forwarding the duration of two epochs."
-            )
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
\ No newline at end of file
+        forwards = 0
+        while vega.statistics().epoch_seq < epoch:
+            # Only when validators.epoch.length changed while forwarding
+            vega.wait_fn(1)
+            forwards += 1
+            if forwards > 2 * 10 * 60:
+                raise Exception(
+                    "Epoch not started after forwarding the duration of two epochs."
+                )
+
+def _forward_to(vega: VegaServiceNull, stats, target: float):
+    seconds = target - _to_seconds(stats.vega_time)
+    if seconds <= 0:
+        return
+    blocks = math.ceil(seconds / vega.seconds_per_block)
+    vega.wait_fn(blocks)
+    metrics.increment("advance.blocks", blocks)
+
+# Core statistics times are RFC3339 with nanoseconds, e.g. 2023-11-01T12:00:00.123456789Z
+def _to_seconds(value: str) -> float:
+    date, _, fraction = value.rstrip("Z").partition(".")
+    parsed = datetime.strptime(date, "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+    return parsed.timestamp() + (float(f"0.{fraction}") if fraction else 0)
+
+# Transactions sent through vega.wallet since the last settle, and in total, per environment
+_pending = {}
+_submitted = {}
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600}
+# The chain time and blocks the old forward("10s") + wait_fn(1) advanced
+BASELINE_DURATION = "10s"
+
+def track_transactions(vega: VegaServiceNull):
+    wallet = vega.wallet
+    submit_transaction = wallet.submit_transaction
+    def tracked_submit_transaction(*args, **kwargs):
+        result = submit_transaction(*args, **kwargs)
+        _pending[vega.log_dir] = _pending.get(vega.log_dir, 0) + 1
+        _submitted[vega.log_dir] = _submitted.get(vega.log_dir, 0) + 1
+        return result
+    wallet.submit_transaction = tracked_submit_transaction
+
+def submitted_transactions(vega: VegaServiceNull) -> int:
+    return _submitted.get(vega.log_dir, 0)
+
+def forget_transactions(vega: VegaServiceNull):
+    _pending.pop(vega.log_dir, None)
+    _submitted.pop(vega.log_dir, None)
+
+def _blocks_for(vega: VegaServiceNull, duration: str) -> int:
+    seconds = float(duration[:-1]) * _DURATION_UNITS[duration[-1]]
+    return math.ceil(seconds / vega.seconds_per_block)
+
+def settle(vega: VegaServiceNull, duration: Optional[str] = None):
+    # Transactions submitted from the console don't go through vega.wallet, so
+    # at least one block is always produced
+    pending = _pending.pop(vega.log_dir, 0)
+    blocks = max(1, math.ceil(pending / vega.transactions_per_block))
+    if duration is not None:
+        blocks = max(blocks, _blocks_for(vega, duration))
+    start = time.perf_counter()
+    # wait_fn waits for the core to process every block it forwards, after which
+    # the data node only has to catch up to that height
+    vega.wait_fn(blocks)
+    vega.wait_for_datanode_sync()
+    elapsed = time.perf_counter() - start
+    blocks_saved = _blocks_for(vega, BASELINE_DURATION) + 1 - blocks
+    metrics.increment("settle.calls")
+    metrics.increment("settle.blocks", blocks)
+    metrics.increment("settle.blocks_saved", blocks_saved)
+    metrics.increment("settle.seconds_saved", blocks_saved * elapsed / blocks)
+    metrics.observe("settle.wall", elapsed)
+    logger.debug(
+        f"Settled {pending} transactions in {blocks} blocks ({elapsed:.2f}s)"
+    )
@@ -1,5 +1,7 @@
 from typing import List, Tuple, Optional
-from vega_sim.service import VegaService, PeggedOrder
+from vega_sim.service import VegaService
+
+from actions.utils import settle
 
 def submit_order(
     vega: VegaService,
@@ -10,6 +12,7 @@ def submit_order(
     price: float,
     peak_size: Optional[float] = None,
     minimum_visible_size: Optional[float] = None,
+    wait: bool = True,
 ):
     return vega.submit_order(
         trading_key=wallet_name,
@@ -21,6 +24,7 @@ def submit_order(
         price=price,
         peak_size=peak_size,
         minimum_visible_size=minimum_visible_size,
+        wait=wait,
     )
 
 
@@ -30,12 +34,31 @@ def submit_multiple_orders(
     market_id: str,
     side: str,
     volume_price_pair: List[Tuple[float, float]],
+    wait: bool = True,
 ):
-    for volume, price in volume_price_pair:
-        submit_order(vega, wallet_name, market_id, side, volume, price)
+    # One batch of market instructions, which vega splits at
+    # spam.protection.max.batchSize itself
+    vega.submit_instructions(
+        key_name=wallet_name,
+        submissions=[
+            vega.create_order_submission(
+                market_id=market_id,
+                size=volume,
+                side=side,
+                order_type="TYPE_LIMIT",
+                time_in_force="TIME_IN_FORCE_GTC",
+                price=price,
+            )
+            for volume, price in volume_price_pair
+        ],
+    )
+    if wait:
+        settle(vega)
 
 
 def submit_liquidity(vega: VegaService, wallet_name: str, market_id: str):
+    # Liquidity commitments can't go in a batch, but they are sent without
+    # waiting so both land in the same block
     vega.submit_simple_liquidity(
         key_name=wallet_name,
         market_id=market_id,
@@ -43,23 +66,18 @@ def submit_liquidity(vega: VegaService, wallet_name: str, market_id: str):
         fee=0.000,
         is_amendment=False,
     )
-    vega.submit_order(
-        market_id=market_id,
-        trading_key=wallet_name,
-        side="SIDE_BUY",
-        order_type="TYPE_LIMIT",
-        pegged_order=PeggedOrder(reference="PEGGED_REFERENCE_MID", offset=1),
-        wait=False,
-        time_in_force="TIME_IN_FORCE_GTC",
-        volume=99,
+    vega.submit_instructions(
+        key_name=wallet_name,
+        submissions=[
+            vega.create_order_submission(
+                market_id=market_id,
+                size=99,
+                side=side,
+                order_type="TYPE_LIMIT",
+                time_in_force="TIME_IN_FORCE_GTC",
+                pegged_reference="PEGGED_REFERENCE_MID",
+                pegged_offset=1,
+            )
+            for side in ["SIDE_BUY", "SIDE_SELL"]
+        ],
     )
-    vega.submit_order(
-        market_id=market_id,
-        trading_key=wallet_name,
-        side="SIDE_SELL",
-        order_type="TYPE_LIMIT",
-        pegged_order=PeggedOrder(reference="PEGGED_REFERENCE_MID", offset=1),
-        wait=False,
-        time_in_force="TIME_IN_FORCE_GTC",
-        volume=99,
-    )
\ No newline at end of file
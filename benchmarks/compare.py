@@ -0,0 +1,52 @@
+import argparse
+import json
+
+
+def _load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _delta(base: float, head: float) -> str:
+    if not base:
+        return f"{'-':>8}"
+    return f"{(head - base) / base * 100:>+7.1f}%"
+
+
+# Median and p95 of every route and metric measured in both runs
+def compare(base: dict, head: dict):
+    rows = []
+    for route, metrics in base["routes"].items():
+        for metric, stats in metrics.items():
+            other = head["routes"].get(route, {}).get(metric)
+            if other is None:
+                continue
+            rows.append((route, metric, stats, other))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare two benchmark results, e.g. of two console images"
+    )
+    parser.add_argument("base")
+    parser.add_argument("head")
+    args = parser.parse_args()
+    base, head = _load(args.base), _load(args.head)
+    print(f"base: {base['console_image']}\nhead: {head['console_image']}\n")
+    print(
+        f"{'route':28} {'metric':22} {'median':>18} {'change':>8}"
+        f" {'p95':>18} {'change':>8}"
+    )
+    for route, metric, old, new in compare(base, head):
+        print(
+            f"{route:28} {metric:22}"
+            f" {old['median']:>8.1f} {new['median']:>9.1f}"
+            f" {_delta(old['median'], new['median'])}"
+            f" {old['p95']:>8.1f} {new['p95']:>9.1f}"
+            f" {_delta(old['p95'], new['p95'])}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import json
+import logging
+import math
+import os
+import statistics
+from collections import defaultdict
+from typing import Dict, List
+
+from config import benchmark_output, benchmark_samples, console_image_name
+
+logger = logging.getLogger()
+
+# Samples of every route and metric measured during the session
+_samples: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+
+
+def record(route: str, sample: Dict[str, float]):
+    for metric, value in sample.items():
+        _samples[route][metric].append(value)
+
+
+def p95(values: List[float]) -> float:
+    # Nearest rank, so it is always one of the measured values
+    ordered = sorted(values)
+    return ordered[math.ceil(0.95 * len(ordered)) - 1]
+
+
+def summarize(samples: Dict[str, Dict[str, List[float]]]) -> dict:
+    return {
+        "console_image": console_image_name,
+        "samples": benchmark_samples,
+        "routes": {
+            route: {
+                metric: {
+                    "median": statistics.median(values),
+                    "p95": p95(values),
+                    "values": values,
+                }
+                for metric, values in metrics.items()
+            }
+            for route, metrics in samples.items()
+        },
+    }
+
+
+def write():
+    if not _samples:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(benchmark_output)), exist_ok=True)
+    with open(benchmark_output, "w") as f:
+        json.dump(summarize(_samples), f, indent=2)
+    logger.info(f"Benchmark results written to {benchmark_output}")
@@ -0,0 +1,109 @@
+import pytest
+from playwright.sync_api import Browser, Page, TimeoutError
+
+from benchmarks import report
+from config import benchmark_samples
+from conftest import init_page, init_vega
+from environment import profiles
+from fixtures.market import setup_continuous_market
+
+ROUTES = ["/#/markets/{market_id}", "/#/markets/all", "/#/portfolio"]
+# One load waits at most about 45s, well within the pytest timeout
+LOAD_TIMEOUT = 20000
+FIRST_ROW_TIMEOUT = 15000
+NETWORK_IDLE_TIMEOUT = 10000
+
+# Installed before any console script runs: counts long tasks and notes when
+# the first row of any grid is rendered
+OBSERVERS = """
+window.__bench = { longTasks: 0, longTaskMs: 0, firstRow: null };
+new PerformanceObserver((list) => {
+  for (const entry of list.getEntries()) {
+    window.__bench.longTasks += 1;
+    window.__bench.longTaskMs += entry.duration;
+  }
+}).observe({ type: "longtask", buffered: true });
+new MutationObserver((mutations, observer) => {
+  if (document.querySelector(".ag-center-cols-container .ag-row")) {
+    window.__bench.firstRow = performance.now();
+    observer.disconnect();
+  }
+}).observe(document, { childList: true, subtree: true });
+"""
+
+MEASURE = """
+() => {
+  const navigation = performance.getEntriesByType("navigation")[0];
+  const graphql = performance
+    .getEntriesByType("resource")
+    .filter((entry) => entry.name.includes("graphql"));
+  return {
+    dom_content_loaded_ms: navigation.domContentLoadedEventEnd,
+    load_ms: navigation.loadEventEnd,
+    first_grid_row_ms: window.__bench.firstRow,
+    graphql_requests: graphql.length,
+    graphql_ms: graphql.reduce((total, entry) => total + entry.duration, 0),
+    long_tasks: window.__bench.longTasks,
+    long_task_ms: window.__bench.longTaskMs,
+  };
+}
+"""
+
+
+# Every route and sample is measured on one environment and page, set up the
+# way the auth, risk_accepted and continuous_market fixtures do
+@pytest.fixture(scope="module")
+def vega(request):
+    with init_vega(request) as vega:
+        yield vega
+
+
+@pytest.fixture(scope="module")
+def continuous_market(vega) -> str:
+    return setup_continuous_market(vega)
+
+
+@pytest.fixture(scope="module")
+def page(vega, browser: Browser, request, continuous_market):
+    profile = profiles.profile_for([profiles.AUTH, profiles.RISK_ACCEPTED])
+    with init_page(vega, browser, request, profile=profile) as page:
+        page.add_init_script(OBSERVERS)
+        yield page
+
+
+@pytest.fixture(scope="module", autouse=True)
+def results():
+    yield
+    report.write()
+
+
+def measure(page: Page, url: str) -> dict:
+    # Leaving the console first makes every sample a full page load, as
+    # changing only the hash would not reload it
+    page.goto("about:blank")
+    page.goto(url, timeout=LOAD_TIMEOUT)
+    try:
+        page.wait_for_function(
+            "window.__bench.firstRow !== null", timeout=FIRST_ROW_TIMEOUT
+        )
+    except TimeoutError:
+        pass
+    try:
+        page.wait_for_load_state("networkidle", timeout=NETWORK_IDLE_TIMEOUT)
+    except TimeoutError:
+        pass
+    sample = page.evaluate(MEASURE)
+    # Routes without a populated grid only report the other metrics
+    return {metric: value for metric, value in sample.items() if value is not None}
+
+
+# Every load is its own test, so a slow one can't time out a whole route. The
+# first load of each route only warms up the browser caches and isn't recorded.
+@pytest.mark.parametrize(
+    "route, sample",
+    [(route, sample) for route in ROUTES for sample in range(benchmark_samples + 1)],
+)
+def test_route(continuous_market: str, page: Page, route: str, sample: int):
+    result = measure(page, route.format(market_id=continuous_market))
+    if sample > 0:
+        report.record(route, result)
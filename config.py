@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -7,3 +8,73 @@ console_image_name = os.getenv(
     "CONSOLE_IMAGE_NAME", default="vegaprotocol/trading:develop"
 )
 vega_version = os.getenv("VEGA_VERSION", default="latest")
+
+# Chain-state checkpoints of named setup stages (see environment/checkpoint.py)
+use_checkpoints = os.getenv("USE_CHECKPOINTS", default="false").lower() == "true"
+checkpoint_dir = os.getenv(
+    "CHECKPOINT_DIR", default=os.path.join(os.getcwd(), "checkpoints")
+)
+
+# Wallets of earlier environments, reused instead of generating the same keys
+# again, empty to disable (see environment/wallets.py)
+wallet_cache_dir = os.getenv(
+    "WALLET_CACHE_DIR", default=os.path.join(os.getcwd(), ".wallet-cache")
+)
+
+# Number of environments each worker keeps starting in the background, for the
+# last requested seconds_per_block and checkpoint (see environment/pool.py)
+pool_size = int(os.getenv("VEGA_POOL_SIZE", default="0"))
+# Environments running at once on this host across all workers and sessions,
+# 0 (the default) disables the governor. A new one also waits for free memory
+# and CPU headroom (see environment/governor.py)
+max_environments = int(os.getenv("MAX_ENVIRONMENTS", default="0"))
+min_free_memory_mb = int(os.getenv("MIN_FREE_MEMORY_MB", default="2048"))
+max_cpu_percent = float(os.getenv("MAX_CPU_PERCENT", default="85"))
+# Seconds to wait for a slot or headroom before starting an environment anyway,
+# kept well under the pytest timeout of the fixture that is waiting
+governor_timeout = float(os.getenv("GOVERNOR_TIMEOUT", default="30"))
+governor_lock_dir = os.getenv(
+    "GOVERNOR_LOCK_DIR",
+    default=os.path.join(tempfile.gettempdir(), "console-test-slots"),
+)
+# Run tests asking for the same world state on one environment (see environment/sharing.py)
+# Off by default: transactions sent from the console are only noticed when they
+# move the chain, so a test relying on them has to be marked mutates_chain
+share_environments = os.getenv("SHARE_ENVIRONMENTS", default="false").lower() == "true"
+# Idle browser contexts each worker keeps per environment for reuse (see environment/contexts.py)
+context_pool_size = int(os.getenv("CONTEXT_POOL_SIZE", default="1"))
+# Serve the console's static files from memory to every context of a worker (see environment/assets.py)
+asset_cache = os.getenv("ASSET_CACHE", default="true").lower() == "true"
+
+# "docker" runs a console container per environment, "static" serves the files
+# extracted from console_image_name from an in-process HTTP server
+console_mode = os.getenv("CONSOLE_MODE", default="docker")
+console_cache_dir = os.getenv(
+    "CONSOLE_CACHE_DIR", default=os.path.join(os.getcwd(), ".console-cache")
+)
+console_static_root = os.getenv("CONSOLE_STATIC_ROOT", default="/usr/share/nginx/html")
+
+# "off", "on-failure" (a trace chunk per test, saved when it fails) or "always"
+# (see environment/tracing.py)
+tracing_mode = os.getenv("TRACING", default="on-failure")
+# Record DOM snapshots only, without screenshots and sources
+tracing_snapshots_only = (
+    os.getenv("TRACING_SNAPSHOTS_ONLY", default="false").lower() == "true"
+)
+
+# SQLite database collecting per-test phase timings, empty to disable (see timing.py)
+timing_db = os.getenv("TIMING_DB", default=os.path.join(os.getcwd(), "timings.db"))
+# "lpt" packs test files onto xdist workers by their recorded durations,
+# anything else leaves scheduling to --dist (see scheduler.py)
+test_scheduler = os.getenv("SCHEDULER", default="xdist")
+# Page loads measured per route by the benchmarks/ suite, and the JSON file
+# their median and p95 are written to
+benchmark_samples = int(os.getenv("BENCHMARK_SAMPLES", default="10"))
+benchmark_output = os.getenv(
+    "BENCHMARK_OUTPUT",
+    default=os.path.join(
+        os.getcwd(),
+        "benchmark-results",
+        console_image_name.replace("/", "_").replace(":", "_") + ".json",
+    ),
+)
@@ -1,15 +1,25 @@
 import logging
-import docker
+import metrics
 import pytest
+import scheduler
+import timing
 import os
 import json
-import requests
-import time
 
 from contextlib import contextmanager
+from functools import partial
+from typing import Optional
 from vega_sim.null_service import VegaServiceNull
 from playwright.sync_api import Browser, Page
-from config import console_image_name, vega_version
+from config import test_scheduler, use_checkpoints
+from environment import reaper
+from environment.checkpoint import checkpoint_key, run_stage
+from environment.console import docker_client
+from environment import profiles, tracing
+from environment.contexts import contexts
+from environment.pool import pool
+from environment.sharing import MUTATES_CHAIN, fingerprint, group_items, shared
+from environment.readiness import wait_until_ready
 from fixtures.market import (
     setup_simple_market,
     setup_opening_auction_market,
@@ -22,14 +32,34 @@ import sys
 # https://github.com/pytest-dev/pytest-xdist/issues/402
 sys.stdout = sys.stderr
 
-docker_client = docker.from_env()
 logger = logging.getLogger()
 
 
-@pytest.hookimpl(tryfirst=True)
+@pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     outcome = "passed" if call.excinfo is None else "failed"
     item.config.cache.set(item.nodeid, outcome)
+    report = yield
+    durations = item.__dict__.setdefault("phase_durations", {})
+    durations[call.when] = report.get_result().duration
+    if call.when == "teardown":
+        timing.finish(item.nodeid, durations)
+
+
+def pytest_runtest_setup(item):
+    timing.begin("setup")
+    tracing.begin_test(item)
+
+
+def pytest_runtest_call(item):
+    timing.begin("call")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item):
+    timing.begin("teardown")
+    yield
+    tracing.end_test()
 
 
 def pytest_configure(config):
@@ -45,108 +75,153 @@ def pytest_configure(config):
             filename=os.path.join(log_dir, log_name),
             level=config.getini("log_file_level"),
         )
+    else:
+        reaper.start_session()
+    config.worker_metrics = []
+    config.addinivalue_line(
+        "markers",
+        f"{MUTATES_CHAIN}: run on an environment of its own instead of a shared one",
+    )
 
 
-# Start VegaServiceNull and start up docker container for website
-@contextmanager
-def init_vega(request=None):
-    default_seconds = 1
-    seconds_per_block = default_seconds
-    if request and hasattr(request, "param"):
-        seconds_per_block = request.param
+def pytest_collection_modifyitems(items):
+    group_items(items, CHECKPOINT_STAGES)
 
-    logger.info(
-        "Starting VegaServiceNull",
-        extra={"worker_id": os.environ.get("PYTEST_XDIST_WORKER")},
+
+def pytest_sessionfinish(session):
+    shared.close()
+    pool.close()
+    reaper.drain()
+    # xdist workers hand their metrics over to the controller
+    if hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["metrics"] = metrics.snapshot()
+    else:
+        reaper.sweep(docker_client)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    if "metrics" in getattr(node, "workeroutput", {}):
+        node.config.worker_metrics.append(node.workeroutput["metrics"])
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    if test_scheduler == "lpt":
+        config.lpt_scheduler = scheduler.LPTScheduling(config, log)
+        return config.lpt_scheduler
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    lines = metrics.summary_lines(
+        metrics.merge([metrics.snapshot()] + config.worker_metrics)
     )
-    logger.info(f"Using console image: {console_image_name}")
-    logger.info(f"Using vega version: {vega_version}")
-    with VegaServiceNull(
-        run_with_console=False,
-        launch_graphql=False,
-        retain_log_files=True,
-        use_full_vega_wallet=True,
-        store_transactions=True,
-        transactions_per_block=1000,
-        seconds_per_block=seconds_per_block,
-    ) as vega:
-        try:
-            container = docker_client.containers.run(
-                console_image_name, detach=True, ports={"80/tcp": vega.console_port}
-            )
-            # docker setup
-            logger.info(
-                f"Container {container.id} started",
-                extra={"worker_id": os.environ.get("PYTEST_XDIST_WORKER")},
-            )
-            yield vega
-        except docker.errors.APIError as e:
-            logger.info(f"Container creation failed.")
-            logger.info(e)
-            raise e
-        finally:
-            logger.info(f"Stopping container {container.id}")
-            container.stop()
-            # Remove the container
-            logger.info(f"Removing container {container.id}")
-            container.remove()
+    if hasattr(config, "lpt_scheduler"):
+        lines += config.lpt_scheduler.summary_lines()
+    if lines:
+        terminalreporter.section("environment metrics")
+        for line in lines:
+            terminalreporter.write_line(line)
+
+
+# Fixtures whose world state is restored from a checkpoint when one exists.
+# Bump the version whenever the matching setup function changes.
+CHECKPOINT_STAGES = {
+    "simple_market": "simple_market@v1",
+    "opening_auction_market": "opening_auction_market@v1",
+    "continuous_market": "continuous_market@v1",
+    "proposed_market": "proposed_market@v1",
+}
 
 
+def get_seconds_per_block(request=None):
+    default_seconds = 1
+    if request and hasattr(request, "param"):
+        return request.param
+    return default_seconds
+
+
+# Pick the checkpoint to start from based on the single market fixture requested
+def get_checkpoint(request):
+    if not use_checkpoints:
+        return None
+    stages = [
+        (name, stage)
+        for name, stage in CHECKPOINT_STAGES.items()
+        if name in request.fixturenames
+    ]
+    if len(stages) != 1:
+        return None
+    name, stage = stages[0]
+    kwargs = {}
+    callspec = getattr(request.node, "callspec", None)
+    if callspec is not None:
+        kwargs.update(callspec.params.get(name, {}))
+    return checkpoint_key(stage, get_seconds_per_block(request), **kwargs)
+
+
+# Start VegaServiceNull and start up docker container for website,
+# taking a warm environment from the pool when one is available
+@contextmanager
+def init_vega(request=None, checkpoint=None):
+    # An idle shared environment would hold on to its governor slot while this
+    # one runs, so it makes way
+    shared.close()
+    with timing.phase("init_vega"):
+        env = pool.acquire(get_seconds_per_block(request), checkpoint)
+    try:
+        yield env.vega
+    finally:
+        with timing.phase("release_vega"):
+            contexts.discard(env.vega)
+            pool.release(env)
+
+
+# The page starts with the storage profile matching the auth / risk_accepted
+# fixtures the test asks for, unless a profile is given
 @contextmanager
-def init_page(vega: VegaServiceNull, browser: Browser, request: pytest.FixtureRequest):
-    with browser.new_context(
-        viewport={"width": 1920, "height": 1080},
-        base_url=f"http://localhost:{vega.console_port}",
-    ) as context, context.new_page() as page:
-        context.tracing.start(screenshots=True, snapshots=True, sources=True)
-        try:
-            # Wait for the console to be up and running before any tests are run
-            attempts = 0
-            while attempts < 100:
-                try:
-                    code = requests.get(
-                        f"http://localhost:{vega.console_port}/"
-                    ).status_code
-                    if code == 200:
-                        break
-                except requests.exceptions.ConnectionError as e:
-                    attempts += 1
-                    if attempts < 100:
-                        time.sleep(0.1)
-                        continue
-                    else:
-                        raise e
-
-            # Set window._env_ so built docker image data uses datanode from vega market sim
-            env = json.dumps(
-                {
-                    "VEGA_URL": f"http://localhost:{vega.data_node_rest_port}/graphql",
-                    "VEGA_WALLET_URL": f"http://localhost:{vega.wallet_port}",
-                }
-            )
-            window_env = f"window._env_ = Object.assign({{}}, window._env_, {env})"
-            page.add_init_script(script=window_env)
-            yield page
-        finally:
-            if not os.path.exists("traces"):
-                os.makedirs("traces")
-
-            # Check whether this test failed or passed
-            outcome = request.config.cache.get(request.node.nodeid, None)
-            if outcome != "passed":
-                try:
-                    trace_path = os.path.join("traces", request.node.name + "trace.zip")
-                    context.tracing.stop(path=trace_path)
-                except Exception as e:
-                    logger.error(f"Failed to save trace: {e}")
+def init_page(
+    vega: VegaServiceNull,
+    browser: Browser,
+    request: pytest.FixtureRequest,
+    profile: Optional[str] = None,
+):
+    if profile is None:
+        profile = profiles.profile_for(request.fixturenames)
+    with timing.phase("init_page"):
+        context = contexts.acquire(browser, vega, profile)
+        page = context.new_page()
+        profiles.set_page_profile(page, profile)
+        tracing.start(context)
+    try:
+        # Wait for the console, data node and wallet to be up and running before any tests are run
+        with timing.phase("init_page"):
+            wait_until_ready(vega)
+        yield page
+    finally:
+        # The context may be reused, so its trace has to be stopped
+        with timing.phase("release_page"):
+            tracing.stop(context)
+            contexts.release(vega, context, profile)
 
 
 # default vega & page fixtures with function scope (refreshed at each test) that can be used in tests
 # separate fixtures may be defined in tests if we prefer different scope
+# Tests with the same world state fingerprint share the environment, unless
+# one of them changes it
 @pytest.fixture
 def vega(request):
-    with init_vega(request) as vega:
-        yield vega
+    key = fingerprint(request.node, CHECKPOINT_STAGES)
+    if key is None:
+        with init_vega(request, checkpoint=get_checkpoint(request)) as vega:
+            yield vega
+        return
+    vega = shared.acquire(
+        key, lambda: init_vega(request, checkpoint=get_checkpoint(request))
+    )
+    yield vega
+    failed = request.config.cache.get(request.node.nodeid, None) != "passed"
+    shared.release(vega, failed)
 
 
 @pytest.fixture
@@ -157,34 +232,14 @@ def page(vega, browser, request):
 
 # Set auth token so eager connection for MarketSim wallet is successful
 def auth_setup(vega: VegaServiceNull, page: Page):
-    DEFAULT_WALLET_NAME = "MarketSim"  # This is the default wallet name within VegaServiceNull and CANNOT be changed
-
-    # Calling get_keypairs will internally call _load_tokens for the given wallet
-    keypairs = vega.wallet.get_keypairs(DEFAULT_WALLET_NAME)
-    wallet_api_token = vega.wallet.login_tokens[DEFAULT_WALLET_NAME]
-
-    # Set token to localStorage so eager connect hook picks it up and immediately connects
-    wallet_config = json.dumps(
-        {
-            "token": f"VWT {wallet_api_token}",
-            "connector": "jsonRpc",
-            "url": f"http://localhost:{vega.wallet_port}",
-        }
-    )
+    keypairs, wallet_api_token = profiles.wallet_login(vega)
 
-    storage_javascript = [
-        # Store wallet config so eager connection is initiated
-        f"localStorage.setItem('vega_wallet_config', '{wallet_config}');",
-        # Ensure wallet ris dialog doesnt show, otherwise eager connect wont work
-        "localStorage.setItem('vega_wallet_risk_accepted', 'true');",
-        # Ensure initial risk dialog doesnt show
-        "localStorage.setItem('vega_risk_accepted', 'true');",
-    ]
-    script = "".join(storage_javascript)
-    page.add_init_script(script)
+    # Pages opened with the auth profile already have the token in localStorage
+    if not profiles.has_profile(page, profiles.AUTH):
+        page.add_init_script(storage_script(profiles.auth_items(vega)))
 
     return {
-        "wallet": DEFAULT_WALLET_NAME,
+        "wallet": profiles.DEFAULT_WALLET_NAME,
         "wallet_api_token": wallet_api_token,
         "public_key": keypairs["Key 1"],
     }
@@ -197,15 +252,8 @@ def auth(vega: VegaServiceNull, page: Page):
 
 # Set 'risk accepted' flag, so that the risk dialog doesn't show up
 def risk_accepted_setup(page: Page):
-    onboarding_config = json.dumps({"state": {"dismissed": True}, "version": 0})
-    storage_javascript = [
-        "localStorage.setItem('vega_risk_accepted', 'true');",
-        f"localStorage.setItem('vega_onboarding', '{onboarding_config}');",
-        "localStorage.setItem('vega_telemetry_approval', 'false');",
-        "localStorage.setItem('vega_telemetry_viewed', 'true');",
-    ]
-    script = "".join(storage_javascript)
-    page.add_init_script(script)
+    if not profiles.has_profile(page, profiles.RISK_ACCEPTED):
+        page.add_init_script(storage_script(profiles.risk_accepted_items()))
 
 
 @pytest.fixture(scope="function")
@@ -213,24 +261,43 @@ def risk_accepted(page: Page):
     risk_accepted_setup(page)
 
 
+def storage_script(items: dict) -> str:
+    return "".join(
+        f"localStorage.setItem({json.dumps(name)}, {json.dumps(value)});"
+        for name, value in items.items()
+    )
+
+
 @pytest.fixture(scope="function")
 def simple_market(vega, request):
     kwargs = {}
     if hasattr(request, "param"):
         kwargs.update(request.param)
-    return setup_simple_market(vega, **kwargs)
+    return run_stage(
+        vega, CHECKPOINT_STAGES["simple_market"], setup_simple_market, **kwargs
+    )
 
 
 @pytest.fixture(scope="function")
 def opening_auction_market(vega):
-    return setup_opening_auction_market(vega)
+    return run_stage(
+        vega,
+        CHECKPOINT_STAGES["opening_auction_market"],
+        setup_opening_auction_market,
+    )
 
 
 @pytest.fixture(scope="function")
 def continuous_market(vega):
-    return setup_continuous_market(vega)
+    return run_stage(
+        vega, CHECKPOINT_STAGES["continuous_market"], setup_continuous_market
+    )
 
 
 @pytest.fixture(scope="function")
 def proposed_market(vega):
-    return setup_simple_market(vega, approve_proposal=False)
+    return run_stage(
+        vega,
+        CHECKPOINT_STAGES["proposed_market"],
+        partial(setup_simple_market, approve_proposal=False),
+    )
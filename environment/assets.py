@@ -0,0 +1,74 @@
+import logging
+import os
+import re
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+from playwright.sync_api import BrowserContext, Error, Route
+
+import metrics
+from config import console_image_name
+from environment.console import image_digest
+
+logger = logging.getLogger()
+
+_STATIC_EXTENSIONS = r"js|css|woff2?|ttf|otf|png|jpe?g|gif|svg|ico|webp"
+# Written by the console container on start, so it differs per environment
+_UNCACHED_FILES = {"env-config.js"}
+# Headers describing the transfer rather than the file, the body is stored decoded
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+# Static files of the console (bundles, CSS, fonts, images) are the same for
+# every environment started from one image, so they are fetched once per worker
+# and then served from memory to every context. Only requests to the console
+# origin are routed; GraphQL goes to the data node and wallet calls to the
+# wallet port, both on other origins, and are never touched.
+class AssetCache:
+    def __init__(self):
+        # (image digest, path) -> (status, headers, body)
+        self._entries: Dict[Tuple[str, str], Tuple[int, Dict[str, str], bytes]] = {}
+
+    def install(self, context: BrowserContext, origin: str):
+        digest = image_digest(console_image_name)
+
+        # A regex is matched by the browser, a Python callable would make
+        # Playwright intercept every request to ask it
+        static_url = re.compile(
+            rf"^{re.escape(origin)}/[^?#]*\.({_STATIC_EXTENSIONS})([?#].*)?$"
+        )
+        context.route(static_url, lambda route: self._handle(route, digest))
+
+    def _handle(self, route: Route, digest: str):
+        request = route.request
+        path = urlsplit(request.url).path
+        if request.method != "GET" or os.path.basename(path) in _UNCACHED_FILES:
+            route.fallback()
+            return
+        key = (digest, path)
+        entry = self._entries.get(key)
+        if entry is not None:
+            status, headers, body = entry
+            metrics.increment("assets.hit")
+            metrics.increment("assets.bytes_served", len(body))
+            route.fulfill(status=status, headers=headers, body=body)
+            return
+        metrics.increment("assets.miss")
+        try:
+            response = route.fetch()
+            body = response.body()
+        except Error as e:
+            logger.warning(f"Failed to fetch {request.url} for the asset cache: {e}")
+            route.fallback()
+            return
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in _DROPPED_HEADERS
+        }
+        if response.status == 200:
+            self._entries[key] = (response.status, headers, body)
+        route.fulfill(status=response.status, headers=headers, body=body)
+
+
+assets = AssetCache()
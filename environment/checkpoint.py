@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, Optional, Set
+
+from vega_sim.null_service import VegaServiceNull
+from vega_sim.wallet.base import DEFAULT_WALLET_NAME
+
+from actions.utils import submitted_transactions
+from config import checkpoint_dir, use_checkpoints, vega_version
+from environment.sharing import shared
+
+logger = logging.getLogger()
+
+# A checkpoint is a directory holding the null-chain replay file recorded by the
+# node (store_transactions=True), the wallet files used to sign those
+# transactions and the value returned by the setup stage, e.g. the market id.
+# Restoring starts a fresh VegaServiceNull replaying that file, so node and
+# data-node end up in the exact same state, and copies the wallets back so
+# "Key 1", "mm", "mm2"... are the same keys that own the replayed state.
+REPLAY_FILE = "replay"
+WALLETS_DIR = "wallets"
+METADATA_FILE = "checkpoint.json"
+
+# log_dir of restored VegaServiceNull -> checkpoint key it was restored from
+_restored: Dict[str, str] = {}
+# log_dirs of environments a stage has run on
+_staged: Set[str] = set()
+# (log_dir, checkpoint key) -> result of the stages already run on an environment
+_results: Dict[tuple, Any] = {}
+
+
+class CheckpointError(Exception):
+    pass
+
+
+def checkpoint_key(stage: str, seconds_per_block: int, **kwargs) -> str:
+    # Stage names carry a version, e.g. "continuous_market@v1", which must be
+    # bumped whenever the setup function changes the chain state it produces
+    payload = json.dumps(
+        {
+            "stage": stage,
+            "vega_version": vega_version,
+            "seconds_per_block": seconds_per_block,
+            "kwargs": kwargs,
+        },
+        sort_keys=True,
+    )
+    digest = hashlib.sha1(payload.encode()).hexdigest()[:12]
+    return f"{stage.replace('@', '-')}-{digest}"
+
+
+def _checkpoint_path(key: str) -> str:
+    return os.path.join(checkpoint_dir, key)
+
+
+def _vega_home(vega: VegaServiceNull) -> str:
+    return os.path.join(vega.log_dir, "vegahome")
+
+
+def _wallets_path(vega: VegaServiceNull) -> str:
+    return os.path.join(_vega_home(vega), "data", "wallets")
+
+
+def has_checkpoint(key: str) -> bool:
+    return os.path.exists(os.path.join(_checkpoint_path(key), METADATA_FILE))
+
+
+def replay_file(key: str) -> str:
+    # The node keeps recording into the file it replays from, so every restore
+    # gets its own copy and the checkpoint itself is never modified
+    restore_dir = tempfile.mkdtemp(prefix="vega-checkpoint-")
+    path = os.path.join(restore_dir, REPLAY_FILE)
+    shutil.copyfile(os.path.join(_checkpoint_path(key), REPLAY_FILE), path)
+    return path
+
+
+def remove_replay_file(path: Optional[str]):
+    if path is not None and os.path.basename(os.path.dirname(path)).startswith(
+        "vega-checkpoint-"
+    ):
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+def forget_stages(vega: VegaServiceNull):
+    _restored.pop(vega.log_dir, None)
+    _staged.discard(vega.log_dir)
+    for key in [key for key in _results if key[0] == vega.log_dir]:
+        del _results[key]
+
+
+def restore_wallets(vega: VegaServiceNull, key: str):
+    metadata = _load_metadata(key)
+    shutil.copytree(
+        os.path.join(_checkpoint_path(key), WALLETS_DIR),
+        _wallets_path(vega),
+        dirs_exist_ok=True,
+    )
+    keypairs = vega.wallet.get_keypairs(DEFAULT_WALLET_NAME)
+    if keypairs != metadata["keys"]:
+        raise CheckpointError(
+            f"Restored wallet keys do not match checkpoint {key}: {keypairs}"
+        )
+    vega.wait_for_total_catchup()
+    _restored[vega.log_dir] = key
+    logger.info(f"Restored checkpoint {key}")
+
+
+def restored_checkpoint(vega: VegaServiceNull) -> Optional[str]:
+    return _restored.get(vega.log_dir)
+
+
+def _load_metadata(key: str) -> Dict[str, Any]:
+    with open(os.path.join(_checkpoint_path(key), METADATA_FILE)) as f:
+        return json.load(f)
+
+
+def save_checkpoint(vega: VegaServiceNull, key: str, result: Any):
+    if has_checkpoint(key):
+        return
+    vega.wait_for_total_catchup()
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    # Write into a scratch directory and rename it into place, so that
+    # concurrent xdist workers never see a half written checkpoint
+    tmp_path = tempfile.mkdtemp(prefix=f".{key}-", dir=checkpoint_dir)
+    try:
+        recorded = vega.replay_from_path or os.path.join(_vega_home(vega), REPLAY_FILE)
+        shutil.copyfile(recorded, os.path.join(tmp_path, REPLAY_FILE))
+        shutil.copytree(_wallets_path(vega), os.path.join(tmp_path, WALLETS_DIR))
+        with open(os.path.join(tmp_path, METADATA_FILE), "w") as f:
+            json.dump(
+                {
+                    "key": key,
+                    "result": result,
+                    "keys": vega.wallet.get_keypairs(DEFAULT_WALLET_NAME),
+                },
+                f,
+            )
+        os.rename(tmp_path, _checkpoint_path(key))
+        logger.info(f"Saved checkpoint {key}")
+    except OSError as e:
+        # Another worker saved the same checkpoint first
+        logger.info(f"Checkpoint {key} not saved: {e}")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def run_stage(vega: VegaServiceNull, stage: str, setup: Callable[..., Any], **kwargs):
+    """Runs a setup stage, or returns its recorded result if vega was restored
+    from the checkpoint of that stage."""
+    key = checkpoint_key(stage, vega.seconds_per_block, **kwargs)
+    if restored_checkpoint(vega) == key:
+        return _load_metadata(key)["result"]
+    # An environment shared by several tests runs each stage once, module and
+    # class-scoped ones give every test a fresh market as before
+    memoize = vega is shared.vega
+    if memoize and (vega.log_dir, key) in _results:
+        return _results[(vega.log_dir, key)]
+    # A checkpoint has to hold this stage only, not what earlier stages or
+    # transactions left on the chain
+    fresh = vega.log_dir not in _staged and submitted_transactions(vega) == 0
+    _staged.add(vega.log_dir)
+    with shared.stage(vega):
+        result = setup(vega, **kwargs)
+    if use_checkpoints and fresh:
+        save_checkpoint(vega, key, result)
+    if memoize:
+        _results[(vega.log_dir, key)] = result
+    return result
@@ -0,0 +1,134 @@
+import functools
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import docker
+
+from config import (
+    console_cache_dir,
+    console_image_name,
+    console_mode,
+    console_static_root,
+)
+from environment.readiness import console_probe, probe
+from environment.reaper import container_labels, reap
+
+docker_client = docker.from_env()
+logger = logging.getLogger()
+
+_extract_lock = threading.Lock()
+
+
+# Serves the files of the console image the same way its nginx does: unknown
+# paths fall back to index.html and nothing is logged per request
+class StaticConsoleHandler(SimpleHTTPRequestHandler):
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.exists(path):
+            self.path = "/index.html"
+        return super().send_head()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StaticConsole:
+    def __init__(self, port: int, directory: str):
+        handler = functools.partial(StaticConsoleHandler, directory=directory)
+        self.server = ThreadingHTTPServer(("", port), handler)
+        self.server.daemon_threads = True
+        self.id = f"static:{port}"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name=self.id, daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# Pulls the image when the host doesn't have it yet, like containers.run does
+def _image(image_name: str):
+    try:
+        return docker_client.images.get(image_name)
+    except docker.errors.ImageNotFound:
+        logger.info(f"Pulling {image_name}")
+        return docker_client.images.pull(image_name)
+
+
+# Short id of the image, which changes whenever the console build does
+@functools.lru_cache(maxsize=None)
+def image_digest(image_name: str = console_image_name) -> str:
+    return _image(image_name).id.split(":")[-1][:16]
+
+
+# Extract the console files once per image digest, shared by all workers
+def extract_console(image_name: str = console_image_name) -> str:
+    digest = image_digest(image_name)
+    root_name = os.path.basename(console_static_root.rstrip("/"))
+    path = os.path.join(console_cache_dir, digest)
+    with _extract_lock:
+        if not os.path.exists(path):
+            os.makedirs(console_cache_dir, exist_ok=True)
+            tmp_path = tempfile.mkdtemp(prefix=f".{digest}-", dir=console_cache_dir)
+            container = docker_client.containers.create(image_name)
+            try:
+                stream, _ = container.get_archive(console_static_root)
+                with tempfile.TemporaryFile() as archive:
+                    for chunk in stream:
+                        archive.write(chunk)
+                    archive.seek(0)
+                    with tarfile.open(fileobj=archive) as tar:
+                        if hasattr(tarfile, "data_filter"):
+                            tar.extractall(tmp_path, filter="data")
+                        else:
+                            tar.extractall(tmp_path)
+            finally:
+                container.remove()
+            try:
+                os.rename(tmp_path, path)
+                logger.info(f"Extracted {image_name} console to {path}")
+            except OSError:
+                # Another worker extracted the same image first
+                shutil.rmtree(tmp_path, ignore_errors=True)
+    return os.path.join(path, root_name)
+
+
+def start_console(port: int):
+    start = time.perf_counter()
+    if console_mode == "static":
+        console = StaticConsole(port, extract_console())
+        logger.info(f"Static console serving on port {port}")
+        return console
+    container = docker_client.containers.run(
+        console_image_name,
+        detach=True,
+        ports={"80/tcp": port},
+        labels=container_labels(),
+    )
+    # docker setup
+    logger.info(
+        f"Container {container.id} started in {time.perf_counter() - start:.2f}s",
+        extra={"worker_id": os.environ.get("PYTEST_XDIST_WORKER")},
+    )
+    return container
+
+
+def wait_for_console(port: int):
+    probe("console_startup", console_probe(port))
+
+
+def stop_console(console):
+    if isinstance(console, StaticConsole):
+        console.stop()
+        return
+    # Killing and removing the container happens in the background
+    logger.info(f"Reaping container {console.id}")
+    reap(console)
@@ -0,0 +1,132 @@
+import json
+import logging
+from typing import Dict, List
+
+from playwright.sync_api import Browser, BrowserContext, Error
+from vega_sim.null_service import VegaServiceNull
+
+import metrics
+from config import asset_cache, context_pool_size
+from environment import profiles
+from environment.assets import assets
+
+logger = logging.getLogger()
+
+VIEWPORT = {"width": 1920, "height": 1080}
+
+_RESET_STORAGE = """
+async items => {
+    localStorage.clear();
+    sessionStorage.clear();
+    for (const [name, value] of Object.entries(items)) {
+        localStorage.setItem(name, value);
+    }
+    if (navigator.serviceWorker) {
+        const registrations = await navigator.serviceWorker.getRegistrations();
+        await Promise.all(registrations.map(registration => registration.unregister()));
+    }
+}
+"""
+
+
+def window_env_script(vega: VegaServiceNull) -> str:
+    # Set window._env_ so built docker image data uses datanode from vega market sim
+    env = json.dumps(
+        {
+            "VEGA_URL": f"http://localhost:{vega.data_node_rest_port}/graphql",
+            "VEGA_WALLET_URL": f"http://localhost:{vega.wallet_port}",
+        }
+    )
+    return f"window._env_ = Object.assign({{}}, window._env_, {env})"
+
+
+# Keeps up to `size` idle browser contexts per environment and storage profile
+# for this worker. A context is bound to its environment through base_url and
+# the window._env_ init script, so it is only handed out again for the same
+# environment. Tests get a new page every time, which drops page init scripts,
+# routes and the viewport; the context itself is reset by putting its storage
+# back to the profile it was created with.
+class ContextPool:
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: Dict[tuple, List[BrowserContext]] = {}
+
+    def acquire(
+        self, browser: Browser, vega: VegaServiceNull, profile: str = profiles.FRESH
+    ) -> BrowserContext:
+        idle = self._idle.get((vega.log_dir, profile))
+        while idle:
+            context = idle.pop()
+            if context.browser is browser:
+                metrics.increment("contexts.reused")
+                return context
+            self._close(context)
+        metrics.increment("contexts.created")
+        with metrics.timer("contexts.new"):
+            context = browser.new_context(
+                viewport=VIEWPORT,
+                base_url=profiles.console_origin(vega),
+                storage_state=profiles.storage_state(vega, profile),
+            )
+            context.add_init_script(script=window_env_script(vega))
+            if asset_cache:
+                assets.install(context, profiles.console_origin(vega))
+        return context
+
+    def release(
+        self,
+        vega: VegaServiceNull,
+        context: BrowserContext,
+        profile: str = profiles.FRESH,
+    ):
+        idle = self._idle.setdefault((vega.log_dir, profile), [])
+        if len(idle) >= self.size or not self._reset(vega, context, profile):
+            self._close(context)
+            return
+        idle.append(context)
+
+    # Close the idle contexts of an environment that is being stopped
+    def discard(self, vega: VegaServiceNull):
+        for key in [key for key in self._idle if key[0] == vega.log_dir]:
+            for context in self._idle.pop(key):
+                self._close(context)
+        profiles.forget(vega)
+
+    def _reset(
+        self, vega: VegaServiceNull, context: BrowserContext, profile: str
+    ) -> bool:
+        origin = profiles.console_origin(vega)
+        items = profiles.profile_items(vega, profile)
+        with metrics.timer("contexts.reset"):
+            try:
+                for page in context.pages:
+                    if page.url.startswith(origin):
+                        page.evaluate(_RESET_STORAGE, items)
+                    elif page.url.startswith("http"):
+                        page.evaluate(_RESET_STORAGE, {})
+                    page.close()
+                context.clear_cookies()
+                context.clear_permissions()
+                # Storage of an origin the page navigated away from can't be
+                # reset from here, such a context is not reused
+                state = context.storage_state()
+            except Error as e:
+                logger.warning(f"Failed to reset browser context: {e}")
+                return False
+        for state_origin in state["origins"]:
+            actual = {
+                item["name"]: item["value"] for item in state_origin["localStorage"]
+            }
+            if actual != (items if state_origin["origin"] == origin else {}):
+                return False
+        return not state["cookies"]
+
+    def _close(self, context: BrowserContext):
+        try:
+            context.close()
+        except Error:
+            # Already closed together with its browser
+            pass
+
+
+contexts = ContextPool(context_pool_size)
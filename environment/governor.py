@@ -0,0 +1,117 @@
+import fcntl
+import logging
+import os
+import time
+from typing import Optional
+
+import psutil
+
+import metrics
+from config import (
+    governor_lock_dir,
+    governor_timeout,
+    max_cpu_percent,
+    max_environments,
+    min_free_memory_mb,
+)
+
+logger = logging.getLogger()
+
+POLL_INTERVAL = 1
+
+# Starts the interval the first non-blocking cpu_percent call measures over
+psutil.cpu_percent(interval=None)
+
+
+# One of the host-wide environment slots, held through a lock on its file for as
+# long as the environment runs. The lock goes away with the process holding it,
+# so a crashed worker never leaks a slot. The holder also writes its pid into
+# the file, so slots can be counted without taking their locks.
+class Slot:
+    def __init__(self, index: int, fd: int):
+        self.index = index
+        self.fd = fd
+
+    def release(self):
+        os.ftruncate(self.fd, 0)
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+
+
+def _slot_path(index: int) -> str:
+    return os.path.join(governor_lock_dir, f"slot-{index}.lock")
+
+
+def _lock(index: int) -> Optional[Slot]:
+    fd = os.open(_slot_path(index), os.O_RDWR | os.O_CREAT)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    os.ftruncate(fd, 0)
+    os.pwrite(fd, str(os.getpid()).encode(), 0)
+    return Slot(index, fd)
+
+
+# Slots whose file names a running process. A crashed holder leaves its pid
+# behind, but its lock is gone and so is the process.
+def _held_slots() -> int:
+    held = 0
+    for index in range(max_environments):
+        try:
+            with open(_slot_path(index)) as f:
+                pid = f.read().strip()
+        except FileNotFoundError:
+            continue
+        if pid.isdigit() and psutil.pid_exists(int(pid)):
+            held += 1
+    return held
+
+
+def _free_slot() -> Optional[Slot]:
+    for index in range(max_environments):
+        slot = _lock(index)
+        if slot is not None:
+            return slot
+    return None
+
+
+def _headroom() -> bool:
+    available_mb = psutil.virtual_memory().available / 2**20
+    if available_mb < min_free_memory_mb:
+        metrics.increment("governor.low_memory")
+        return False
+    # Usage since the previous call, so admission doesn't block for a sample
+    if psutil.cpu_percent(interval=None) > max_cpu_percent:
+        metrics.increment("governor.busy_cpu")
+        return False
+    return True
+
+
+# Blocks until this host runs fewer than max_environments environments and has
+# the free memory and CPU to start another one. The first environment on the
+# host is always admitted, and so is any after waiting governor_timeout
+# seconds, so an overloaded host slows down instead of deadlocking.
+def acquire_slot() -> Optional[Slot]:
+    if max_environments <= 0:
+        return None
+    os.makedirs(governor_lock_dir, exist_ok=True)
+    start = time.perf_counter()
+    while True:
+        waited = time.perf_counter() - start
+        slot = _free_slot()
+        if slot is not None and (_held_slots() == 1 or _headroom()):
+            metrics.observe("governor.wait", waited)
+            return slot
+        if waited > governor_timeout:
+            metrics.increment("governor.forced")
+            logger.warning(
+                f"Starting environment without a free slot or headroom after {waited:.0f}s"
+            )
+            metrics.observe("governor.wait", waited)
+            # Over the limit when every slot is taken, so nothing is held
+            return slot
+        if slot is not None:
+            slot.release()
+        time.sleep(POLL_INTERVAL)
@@ -0,0 +1,164 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import docker
+from vega_sim.null_service import VegaServiceNull
+
+import metrics
+import timing
+from actions import lookup
+from actions.utils import forget_transactions, track_transactions
+from config import (
+    console_image_name,
+    max_environments,
+    vega_version,
+    wallet_cache_dir,
+)
+from environment import wallets
+from environment.checkpoint import (
+    forget_stages,
+    has_checkpoint,
+    remove_replay_file,
+    replay_file,
+    restore_wallets,
+)
+from environment.console import start_console, stop_console, wait_for_console
+from environment.governor import Slot, acquire_slot
+from environment.readiness import forget
+
+logger = logging.getLogger()
+
+
+# A started VegaServiceNull together with the console container serving it
+class Environment:
+    def __init__(
+        self, vega: VegaServiceNull, container, key: tuple, slot: Optional[Slot]
+    ):
+        self.vega = vega
+        self.container = container
+        self.key = key
+        self.slot = slot
+
+
+def start_environment(
+    seconds_per_block: int = 1, checkpoint: Optional[str] = None
+) -> Environment:
+    replay_from_path = None
+    if checkpoint is not None and has_checkpoint(checkpoint):
+        replay_from_path = replay_file(checkpoint)
+        logger.info(f"Starting from checkpoint {checkpoint}")
+
+    logger.info(
+        "Starting VegaServiceNull",
+        extra={"worker_id": os.environ.get("PYTEST_XDIST_WORKER")},
+    )
+    logger.info(f"Using console image: {console_image_name}")
+    logger.info(f"Using vega version: {vega_version}")
+    # Hold one of the host's environment slots until the environment is stopped
+    with timing.phase("governor"):
+        slot = acquire_slot()
+    if slot is None and max_environments > 0:
+        # Every slot was still taken after GOVERNOR_TIMEOUT, so this environment
+        # runs over the limit and has no slot to release when it stops
+        metrics.increment("governor.over_limit")
+        logger.warning("Starting environment without a governor slot")
+    try:
+        return _start(seconds_per_block, checkpoint, replay_from_path, slot)
+    except Exception:
+        remove_replay_file(replay_from_path)
+        if slot is not None:
+            slot.release()
+        raise
+
+
+def _start(
+    seconds_per_block: int,
+    checkpoint: Optional[str],
+    replay_from_path: Optional[str],
+    slot: Optional[Slot],
+) -> Environment:
+    vega = VegaServiceNull(
+        run_with_console=False,
+        launch_graphql=False,
+        retain_log_files=True,
+        use_full_vega_wallet=True,
+        store_transactions=True,
+        transactions_per_block=1000,
+        seconds_per_block=seconds_per_block,
+        replay_from_path=replay_from_path,
+    )
+    # Ports are assigned when VegaServiceNull is created, so the console can
+    # boot on its own thread while the node, data node and wallet start up
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        console_future = executor.submit(_start_console_and_wait, vega.console_port)
+        try:
+            with metrics.timer("startup.vega"), timing.phase("vega_start"):
+                vega.start()
+            logger.info(
+                f"VegaServiceNull started in {time.perf_counter() - start:.2f}s"
+            )
+            if replay_from_path is not None:
+                restore_wallets(vega, checkpoint)
+            elif wallet_cache_dir:
+                wallets.import_wallets(vega)
+            track_transactions(vega)
+            lookup.track_blocks(vega)
+            timing.instrument(vega)
+        except Exception:
+            console_future.add_done_callback(_stop_started_console)
+            vega.stop()
+            raise
+        try:
+            with timing.phase("console_start"):
+                container = console_future.result()
+        except Exception as e:
+            if isinstance(e, docker.errors.APIError):
+                logger.info("Container creation failed.")
+            logger.info(e)
+            vega.stop()
+            raise
+    elapsed = time.perf_counter() - start
+    metrics.observe("startup.environment", elapsed)
+    logger.info(f"Environment ready in {elapsed:.2f}s")
+    return Environment(vega, container, (seconds_per_block, checkpoint), slot)
+
+
+def _start_console_and_wait(port: int):
+    start = time.perf_counter()
+    with metrics.timer("startup.console_container"):
+        container = start_console(port)
+    try:
+        with metrics.timer("startup.console_ready"):
+            wait_for_console(port)
+    except Exception:
+        stop_console(container)
+        raise
+    logger.info(f"Console ready in {time.perf_counter() - start:.2f}s")
+    return container
+
+
+def _stop_started_console(future):
+    if future.exception() is None:
+        stop_console(future.result())
+
+
+def stop_environment(env: Environment):
+    forget(env.vega)
+    lookup.forget(env.vega)
+    wallets.forget(env.vega)
+    forget_stages(env.vega)
+    forget_transactions(env.vega)
+    try:
+        stop_console(env.container)
+    finally:
+        try:
+            env.vega.stop()
+        finally:
+            # The copy of the checkpoint's replay file the node was started from
+            remove_replay_file(env.vega.replay_from_path)
+            if env.slot is not None:
+                env.slot.release()
@@ -0,0 +1,114 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import metrics
+from config import pool_size
+from environment.lifecycle import Environment, start_environment, stop_environment
+
+logger = logging.getLogger()
+
+
+# Keeps `size` environments starting or started in the background for the
+# (seconds_per_block, checkpoint) key this worker requested last. Warm
+# environments of keys requested before are stopped to stay within `size`, as
+# tests asking for the same key are mostly collected next to each other.
+# VegaServiceNull owns its node processes through a multiprocessing handle that
+# cannot be passed to another process, so each xdist worker has its own pool
+# and the per-worker stats are merged by the controller at session end.
+class EnvironmentPool:
+    def __init__(self, size: int):
+        self.size = size
+        self._executor = ThreadPoolExecutor(
+            max_workers=size + 2, thread_name_prefix="vega-pool"
+        )
+        self._lock = threading.Lock()
+        self._warm: Dict[tuple, List[Future]] = {}
+
+    def acquire(
+        self, seconds_per_block: int = 1, checkpoint: Optional[str] = None
+    ) -> Environment:
+        key = (seconds_per_block, checkpoint)
+        start = time.perf_counter()
+        env = None
+        future = self._take(key)
+        if future is None:
+            metrics.increment("pool.miss")
+        else:
+            metrics.increment("pool.hit" if future.done() else "pool.hit_waiting")
+            try:
+                env = future.result()
+            except Exception as e:
+                metrics.increment("pool.failed")
+                logger.warning(f"Warm environment failed to start: {e}")
+        if env is None:
+            env = start_environment(seconds_per_block, checkpoint)
+        metrics.observe("pool.wait", time.perf_counter() - start)
+        self._refill(key)
+        return env
+
+    def release(self, env: Environment):
+        # Chain state is not reusable, so an environment is recycled by stopping
+        # it and starting a fresh one in its place
+        if self.size == 0:
+            stop_environment(env)
+        else:
+            self._executor.submit(self._stop, env)
+
+    def close(self):
+        with self._lock:
+            futures = [future for queue in self._warm.values() for future in queue]
+            self._warm = {}
+        for future in futures:
+            self._discard(future)
+        self._executor.shutdown(wait=True)
+
+    def _take(self, key: tuple) -> Optional[Future]:
+        with self._lock:
+            queue = self._warm.get(key, [])
+            for future in queue:
+                if future.done():
+                    queue.remove(future)
+                    return future
+            return queue.pop(0) if queue else None
+
+    def _refill(self, key: tuple):
+        if self.size == 0:
+            return
+        evicted = []
+        with self._lock:
+            # Dicts keep insertion order, the key requested last goes at the end
+            queue = self._warm.pop(key, [])
+            self._warm[key] = queue
+            while len(queue) < self.size:
+                queue.append(self._executor.submit(start_environment, *key))
+            warm = sum(len(queue) for queue in self._warm.values())
+            for other in list(self._warm):
+                if warm <= self.size:
+                    break
+                if other != key:
+                    stale = self._warm.pop(other)
+                    warm -= len(stale)
+                    evicted.extend(stale)
+        for future in evicted:
+            metrics.increment("pool.evicted")
+            self._discard(future)
+
+    def _discard(self, future: Future):
+        if not future.cancel():
+            future.add_done_callback(self._stop_started)
+
+    def _stop(self, env: Environment):
+        try:
+            stop_environment(env)
+        except Exception as e:
+            logger.warning(f"Failed to stop environment: {e}")
+
+    def _stop_started(self, future: Future):
+        if future.exception() is None:
+            self._stop(future.result())
+
+
+pool = EnvironmentPool(pool_size)
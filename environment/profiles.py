@@ -0,0 +1,137 @@
+import json
+import os
+import tempfile
+import weakref
+from typing import Dict, Iterable, Tuple
+
+from playwright.sync_api import Page
+from vega_sim.null_service import VegaServiceNull
+
+# This is the default wallet name within VegaServiceNull and CANNOT be changed
+DEFAULT_WALLET_NAME = "MarketSim"
+
+AUTH = "auth"
+RISK_ACCEPTED = "risk_accepted"
+FRESH = "fresh"
+
+_storage_dir = tempfile.mkdtemp(prefix="storage-state-")
+# (log_dir, profile) -> path of the storage_state file
+_storage_states: Dict[tuple, str] = {}
+_logins: Dict[str, Tuple[Dict[str, str], str]] = {}
+# Profile each page was created with
+_page_profiles = weakref.WeakKeyDictionary()
+
+
+def risk_accepted_items() -> Dict[str, str]:
+    return {
+        # Ensure initial risk dialog doesnt show
+        "vega_risk_accepted": "true",
+        "vega_onboarding": json.dumps({"state": {"dismissed": True}, "version": 0}),
+        "vega_telemetry_approval": "false",
+        "vega_telemetry_viewed": "true",
+    }
+
+
+# Key pairs and API token of the default wallet, looked up once per environment
+def wallet_login(vega: VegaServiceNull) -> Tuple[Dict[str, str], str]:
+    if vega.log_dir not in _logins:
+        # Calling get_keypairs will internally call _load_tokens for the given wallet
+        keypairs = vega.wallet.get_keypairs(DEFAULT_WALLET_NAME)
+        _logins[vega.log_dir] = (
+            keypairs,
+            vega.wallet.login_tokens[DEFAULT_WALLET_NAME],
+        )
+    return _logins[vega.log_dir]
+
+
+# Set auth token so eager connection for MarketSim wallet is successful
+def auth_items(vega: VegaServiceNull) -> Dict[str, str]:
+    _, wallet_api_token = wallet_login(vega)
+    return {
+        # Store wallet config so eager connection is initiated
+        "vega_wallet_config": json.dumps(
+            {
+                "token": f"VWT {wallet_api_token}",
+                "connector": "jsonRpc",
+                "url": f"http://localhost:{vega.wallet_port}",
+            }
+        ),
+        # Ensure wallet risk dialog doesnt show, otherwise eager connect wont work
+        "vega_wallet_risk_accepted": "true",
+        "vega_risk_accepted": "true",
+    }
+
+
+# Profiles are named after the fixtures that ask for them, e.g. "auth+risk_accepted"
+def profile_for(fixturenames: Iterable[str]) -> str:
+    parts = [part for part in (AUTH, RISK_ACCEPTED) if part in fixturenames]
+    return "+".join(parts) or FRESH
+
+
+def profile_items(vega: VegaServiceNull, profile: str) -> Dict[str, str]:
+    items = {}
+    for part in profile.split("+"):
+        if part == AUTH:
+            items.update(auth_items(vega))
+        elif part == RISK_ACCEPTED:
+            items.update(risk_accepted_items())
+        elif part != FRESH:
+            raise ValueError(f"Unknown storage profile: {part}")
+    return items
+
+
+def console_origin(vega: VegaServiceNull) -> str:
+    return f"http://localhost:{vega.console_port}"
+
+
+# Written once per environment and profile and passed to new_context
+def storage_state(vega: VegaServiceNull, profile: str) -> str:
+    key = (vega.log_dir, profile)
+    if key not in _storage_states:
+        items = profile_items(vega, profile)
+        state = {
+            "cookies": [],
+            "origins": (
+                [
+                    {
+                        "origin": console_origin(vega),
+                        "localStorage": [
+                            {"name": name, "value": value}
+                            for name, value in items.items()
+                        ],
+                    }
+                ]
+                if items
+                else []
+            ),
+        }
+        path = os.path.join(
+            _storage_dir, f"{os.path.basename(vega.log_dir)}-{profile}.json"
+        )
+        with open(path, "w") as f:
+            json.dump(state, f)
+        _storage_states[key] = path
+    return _storage_states[key]
+
+
+def forget(vega: VegaServiceNull):
+    _logins.pop(vega.log_dir, None)
+    for key in [key for key in _storage_states if key[0] == vega.log_dir]:
+        os.remove(_storage_states.pop(key))
+
+
+def set_page_profile(page: Page, profile: str):
+    _page_profiles[page] = profile
+
+
+def has_profile(page: Page, part: str) -> bool:
+    return part in _page_profiles.get(page, FRESH).split("+")
+
+
+# For pages that are already open: writes the items straight into localStorage
+# of the current origin, they take effect on the next navigation
+def apply_profile(page: Page, vega: VegaServiceNull, profile: str):
+    page.evaluate(
+        "items => Object.entries(items).forEach(([name, value]) => localStorage.setItem(name, value))",
+        profile_items(vega, profile),
+    )
@@ -0,0 +1,94 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from vega_sim.null_service import VegaServiceNull
+
+import metrics
+
+logger = logging.getLogger()
+
+# One keep-alive connection pool for every probe made by this worker
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+_lock = threading.Lock()
+# log_dir of every environment whose endpoints already answered
+_ready = set()
+
+
+class EnvironmentNotReadyError(Exception):
+    pass
+
+
+def probe(
+    name: str,
+    request: Callable[[], requests.Response],
+    timeout: float = 30,
+    base_delay: float = 0.02,
+    max_delay: float = 1,
+) -> float:
+    # Exponential backoff with full jitter, so that probes started at the same
+    # time by several workers don't keep hitting the endpoints in lockstep
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        try:
+            if request().status_code == 200:
+                latency = time.perf_counter() - start
+                metrics.observe(f"readiness.{name}", latency)
+                return latency
+        except requests.RequestException:
+            # Not listening yet, or too slow to answer while starting up
+            pass
+        if time.perf_counter() - start > timeout:
+            raise EnvironmentNotReadyError(f"{name} not ready after {timeout}s")
+        time.sleep(random.uniform(0, min(max_delay, base_delay * 2**attempt)))
+        attempt += 1
+
+
+def console_probe(port: int) -> Callable[[], requests.Response]:
+    return lambda: session.get(f"http://localhost:{port}/", timeout=5)
+
+
+def endpoint_probes(vega: VegaServiceNull) -> Dict[str, Callable]:
+    return {
+        "console": console_probe(vega.console_port),
+        "graphql": lambda: session.post(
+            f"http://localhost:{vega.data_node_rest_port}/graphql",
+            json={"query": "{ __typename }"},
+            timeout=5,
+        ),
+        "wallet": lambda: session.get(
+            f"http://localhost:{vega.wallet_port}/api/v2/health", timeout=5
+        ),
+    }
+
+
+def wait_until_ready(vega: VegaServiceNull, timeout: float = 30):
+    with _lock:
+        if vega.log_dir in _ready:
+            metrics.increment("readiness.cached")
+            return
+    start = time.perf_counter()
+    probes = endpoint_probes(vega)
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        futures = [
+            executor.submit(probe, name, request, timeout)
+            for name, request in probes.items()
+        ]
+        for future in futures:
+            future.result()
+    metrics.observe("readiness.total", time.perf_counter() - start)
+    with _lock:
+        _ready.add(vega.log_dir)
+
+
+def forget(vega: VegaServiceNull):
+    with _lock:
+        _ready.discard(vega.log_dir)
@@ -0,0 +1,59 @@
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import docker
+
+logger = logging.getLogger()
+
+SESSION_LABEL = "console-test.session"
+WORKER_LABEL = "console-test.worker"
+# Set by the controller before xdist starts the workers, which inherit it
+SESSION_ENV = "CONSOLE_TEST_SESSION"
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="reaper")
+
+
+def start_session() -> str:
+    return os.environ.setdefault(SESSION_ENV, uuid.uuid4().hex)
+
+
+def container_labels() -> dict:
+    return {
+        SESSION_LABEL: os.environ.get(SESSION_ENV, "none"),
+        WORKER_LABEL: os.environ.get("PYTEST_XDIST_WORKER", "master"),
+    }
+
+
+def _remove(container):
+    try:
+        # Kills the container straight away instead of waiting for the stop
+        # grace period, then removes it
+        container.remove(force=True)
+        logger.info(f"Removed container {container.id}")
+    except docker.errors.NotFound:
+        pass
+    except docker.errors.APIError as e:
+        logger.warning(f"Failed to remove container {container.id}: {e}")
+
+
+def reap(container):
+    _executor.submit(_remove, container)
+
+
+def drain():
+    _executor.shutdown(wait=True)
+
+
+# Remove containers left behind by this session, e.g. by a crashed worker
+def sweep(docker_client: docker.DockerClient):
+    session_id = os.environ.get(SESSION_ENV)
+    if session_id is None:
+        return
+    containers = docker_client.containers.list(
+        all=True, filters={"label": f"{SESSION_LABEL}={session_id}"}
+    )
+    for container in containers:
+        logger.info(f"Removing orphaned container {container.id}")
+        _remove(container)
@@ -0,0 +1,116 @@
+import logging
+from contextlib import ExitStack, contextmanager
+from typing import Callable, ContextManager, Iterable, List, Optional
+
+import pytest
+from vega_sim.null_service import VegaServiceNull
+
+import metrics
+from actions.utils import submitted_transactions
+from config import share_environments
+
+logger = logging.getLogger()
+
+# Tests that change the chain in ways that can't be detected, e.g. by leaving a
+# transaction sent from the console unconfirmed, opt out of sharing with this
+MUTATES_CHAIN = "mutates_chain"
+
+
+# The world state a test asks for: the block time of the default function-scoped
+# vega fixture and the setup stages it requests, with their params. Tests with
+# the same fingerprint can run on the same environment. None for tests that get
+# their own, because they are marked, or use a module or class-scoped vega.
+def fingerprint(item: pytest.Item, stages: Iterable[str]) -> Optional[tuple]:
+    if not share_environments or item.get_closest_marker(MUTATES_CHAIN):
+        return None
+    fixturedefs = item._fixtureinfo.name2fixturedefs.get("vega")
+    if not fixturedefs or fixturedefs[-1].scope != "function":
+        return None
+    callspec = getattr(item, "callspec", None)
+    params = callspec.params if callspec is not None else {}
+    return tuple(
+        (name, repr(params.get(name)))
+        for name in ["vega", *stages]
+        if name in item.fixturenames
+    )
+
+
+# Moves tests with the same fingerprint next to each other within their module,
+# so the shared environment is reused before it has to make way for another
+def group_items(items: List[pytest.Item], stages: Iterable[str]):
+    stages = list(stages)
+    first = {}
+    order = []
+    for index, item in enumerate(items):
+        key = fingerprint(item, stages)
+        group = (item.nodeid.split("::")[0], index if key is None else key)
+        order.append((first.setdefault(group, index), index))
+    items[:] = [items[index] for _, index in sorted(order)]
+
+
+def _chain_state(vega: VegaServiceNull):
+    try:
+        return (
+            vega.get_blockchain_time(),
+            submitted_transactions(vega),
+            # Keys created since, which the chain doesn't know about
+            sum(len(keys) for keys in vega.wallet.pub_keys.values()),
+        )
+    except Exception as e:
+        logger.warning(f"Failed to read chain state: {e}")
+        return object()
+
+
+# The environment of the last fingerprint, kept open for the next test with the
+# same one. The state of the chain is recorded once the setup stages have run,
+# and a test that moves the chain or sends a transaction from then on retires
+# the environment, as does a failing one.
+class SharedEnvironment:
+    def __init__(self):
+        self.key = None
+        self.vega = None
+        self._stack = None
+        self._state = None
+
+    def acquire(
+        self, key: tuple, start: Callable[[], ContextManager[VegaServiceNull]]
+    ) -> VegaServiceNull:
+        if self.vega is not None and key == self.key:
+            metrics.increment("sharing.hit")
+            return self.vega
+        self.close()
+        metrics.increment("sharing.miss")
+        stack = ExitStack()
+        self.vega = stack.enter_context(start())
+        self._stack = stack
+        self.key = key
+        self._state = _chain_state(self.vega)
+        return self.vega
+
+    # Wraps a setup stage run on the environment. The stage's changes become part
+    # of the shared state only if nothing else changed the chain before it.
+    @contextmanager
+    def stage(self, vega: VegaServiceNull):
+        pristine = vega is self.vega and _chain_state(vega) == self._state
+        yield
+        if pristine:
+            self._state = _chain_state(vega)
+
+    def release(self, vega: VegaServiceNull, failed: bool):
+        if vega is not self.vega:
+            return
+        if failed or _chain_state(vega) != self._state:
+            metrics.increment("sharing.retired")
+            self.close()
+
+    def close(self):
+        stack = self._stack
+        self.key = None
+        self.vega = None
+        self._stack = None
+        self._state = None
+        if stack is not None:
+            stack.close()
+
+
+shared = SharedEnvironment()
@@ -0,0 +1,103 @@
+import logging
+import os
+import time
+from typing import Dict, Optional, Set
+
+import pytest
+from playwright.sync_api import BrowserContext
+
+import metrics
+from config import tracing_mode, tracing_snapshots_only
+
+logger = logging.getLogger()
+
+OFF = "off"
+ON_FAILURE = "on-failure"
+ALWAYS = "always"
+
+TRACES_DIR = "traces"
+
+# Contexts with tracing started, and those with a chunk open for the current test
+_started: Set[BrowserContext] = set()
+_chunks: Set[BrowserContext] = set()
+_item: Optional[pytest.Item] = None
+# Seconds spent starting and saving traces during the current test
+_overhead: Dict[str, float] = {"seconds": 0}
+
+
+# Called before a test's fixtures are set up: pages that outlive a test, e.g.
+# module-scoped ones, start the new test's chunk here
+def begin_test(item: pytest.Item):
+    global _item
+    _item = item
+    _overhead["seconds"] = 0
+    for context in _started - _chunks:
+        start(context)
+
+
+# Every context keeps one trace running and each test records into its own
+# chunk, so module-scoped pages shared by several tests get a trace per test
+def start(context: BrowserContext):
+    if tracing_mode == OFF or context in _chunks:
+        return
+    begin = time.perf_counter()
+    try:
+        if context not in _started:
+            context.tracing.start(
+                screenshots=not tracing_snapshots_only,
+                snapshots=True,
+                sources=not tracing_snapshots_only,
+            )
+            _started.add(context)
+        context.tracing.start_chunk(title=_item.nodeid if _item else None)
+        _chunks.add(context)
+    except Exception as e:
+        logger.error(f"Failed to start trace: {e}")
+    _overhead["seconds"] += time.perf_counter() - begin
+
+
+def _failed() -> bool:
+    if _item is None:
+        return True
+    # Check whether this test failed or passed
+    return _item.config.cache.get(_item.nodeid, None) != "passed"
+
+
+def _stop_chunk(context: BrowserContext):
+    if context not in _chunks:
+        return
+    _chunks.discard(context)
+    begin = time.perf_counter()
+    try:
+        if tracing_mode == ALWAYS or _failed():
+            os.makedirs(TRACES_DIR, exist_ok=True)
+            name = _item.name if _item else "unknown"
+            context.tracing.stop_chunk(
+                path=os.path.join(TRACES_DIR, name + "trace.zip")
+            )
+        else:
+            context.tracing.stop_chunk()
+    except Exception as e:
+        logger.error(f"Failed to save trace: {e}")
+    _overhead["seconds"] += time.perf_counter() - begin
+
+
+# Called when the context is given back, which is at the end of the last test
+# using it
+def stop(context: BrowserContext):
+    _stop_chunk(context)
+    if context in _started:
+        _started.discard(context)
+        try:
+            context.tracing.stop()
+        except Exception as e:
+            logger.error(f"Failed to stop trace: {e}")
+
+
+# Called after a test's fixtures are torn down: save the chunks of pages that
+# outlive the test
+def end_test():
+    for context in list(_chunks):
+        _stop_chunk(context)
+    if tracing_mode != OFF:
+        metrics.observe("tracing.overhead", _overhead["seconds"])
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from vega_sim.null_service import VegaServiceNull
+from vega_sim.wallet.base import DEFAULT_WALLET_NAME
+
+import metrics
+from config import vega_version, wallet_cache_dir
+
+logger = logging.getLogger()
+
+WALLETS_DIR = "wallets"
+KEYS_FILE = "keys.json"
+# Part of the snapshot key, so snapshots of an older layout are never read
+SNAPSHOT_FORMAT = 2
+
+# Generating a key runs the wallet CLI, which has to decrypt and re-encrypt the
+# wallet. Instead, the wallets directory is stored on disk after every key the
+# default wallet gets, keyed by wallet name, passphrase and the names of its
+# keys in the order they were created. An environment whose wallet matches a
+# stored snapshot takes the next one when it creates a key that has been
+# created in that position before, and ends up with exactly the keys, in the
+# same order, it would have derived itself.
+
+# log_dir -> key names of the default wallet while it matches a stored snapshot
+_lineages: Dict[str, Optional[List[str]]] = {}
+
+
+def _wallets_path(vega: VegaServiceNull) -> str:
+    return os.path.join(vega.log_dir, "vegahome", "data", "wallets")
+
+
+def _snapshot_path(vega: VegaServiceNull, names: List[str]) -> str:
+    with open(os.path.join(vega.log_dir, "vegahome", "passphrase-file")) as f:
+        passphrase = f.read()
+    digest = hashlib.sha256(
+        json.dumps(
+            [SNAPSHOT_FORMAT, DEFAULT_WALLET_NAME, passphrase, vega_version, names]
+        ).encode()
+    ).hexdigest()[:16]
+    return os.path.join(wallet_cache_dir, digest)
+
+
+# Copies the snapshot over the environment's wallets and checks the wallet CLI
+# sees the keys recorded with it. A stale or damaged snapshot is rolled back
+# and reported as not loaded.
+def _load(vega: VegaServiceNull, path: str, names: List[str]) -> bool:
+    try:
+        with open(os.path.join(path, KEYS_FILE)) as f:
+            expected = json.load(f)
+    except (OSError, ValueError):
+        expected = None
+    if expected is None or list(expected) != names:
+        logger.warning(f"Ignoring wallet snapshot {path} without matching keys")
+        metrics.increment("wallets.mismatch")
+        return False
+    backup = tempfile.mkdtemp(prefix="wallets-")
+    try:
+        shutil.copytree(_wallets_path(vega), backup, dirs_exist_ok=True)
+        shutil.copytree(
+            os.path.join(path, WALLETS_DIR), _wallets_path(vega), dirs_exist_ok=True
+        )
+        keypairs = vega.wallet.get_keypairs(DEFAULT_WALLET_NAME)
+        if keypairs != expected:
+            logger.warning(f"Wallet snapshot {path} loaded other keys: {keypairs}")
+            metrics.increment("wallets.mismatch")
+            shutil.rmtree(_wallets_path(vega))
+            shutil.copytree(backup, _wallets_path(vega))
+            return False
+    finally:
+        shutil.rmtree(backup, ignore_errors=True)
+    vega.wallet.pub_keys[DEFAULT_WALLET_NAME] = keypairs
+    return True
+
+
+# Store the wallets of this environment with the keys the wallet CLI lists,
+# unless another worker stored the same key names first. Returns whether the
+# environment matches the snapshot.
+def _save(vega: VegaServiceNull, path: str) -> bool:
+    os.makedirs(wallet_cache_dir, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(prefix=".wallets-", dir=wallet_cache_dir)
+    shutil.copytree(_wallets_path(vega), os.path.join(tmp_path, WALLETS_DIR))
+    with open(os.path.join(tmp_path, KEYS_FILE), "w") as f:
+        json.dump(vega.wallet.get_keypairs(DEFAULT_WALLET_NAME), f)
+    try:
+        os.rename(tmp_path, path)
+        return True
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        return False
+
+
+# Called once the environment has started: swaps the freshly created default
+# wallet for the stored one, then serves vega.wallet.create_key from snapshots
+def import_wallets(vega: VegaServiceNull):
+    names = list(vega.wallet.get_keypairs(DEFAULT_WALLET_NAME))
+    path = _snapshot_path(vega, names)
+    if os.path.exists(path):
+        _lineages[vega.log_dir] = names if _load(vega, path, names) else None
+    else:
+        _lineages[vega.log_dir] = names if _save(vega, path) else None
+
+    wallet = vega.wallet
+    create_key = wallet.create_key
+
+    def cached_create_key(name: str, wallet_name: Optional[str] = None):
+        start = time.perf_counter()
+        lineage = _lineages.get(vega.log_dir)
+        if wallet_name not in (None, DEFAULT_WALLET_NAME) or lineage is None:
+            # Other wallets are not stored, and restoring the default one from
+            # a snapshot would now drop their keys
+            _lineages[vega.log_dir] = None
+            create_key(name, wallet_name=wallet_name)
+            metrics.observe("wallets.create_key.derived", time.perf_counter() - start)
+            return
+        names = lineage + [name]
+        path = _snapshot_path(vega, names)
+        if os.path.exists(path):
+            if _load(vega, path, names):
+                _lineages[vega.log_dir] = names
+                metrics.observe(
+                    "wallets.create_key.cached", time.perf_counter() - start
+                )
+                return
+            # Derived after all, and not stored again over the bad snapshot
+            create_key(name, wallet_name=wallet_name)
+            metrics.observe("wallets.create_key.derived", time.perf_counter() - start)
+            _lineages[vega.log_dir] = None
+            return
+        create_key(name, wallet_name=wallet_name)
+        metrics.observe("wallets.create_key.derived", time.perf_counter() - start)
+        _lineages[vega.log_dir] = names if _save(vega, path) else None
+
+    wallet.create_key = cached_create_key
+
+
+def forget(vega: VegaServiceNull):
+    _lineages.pop(vega.log_dir, None)
@@ -1,6 +1,17 @@
 from collections import namedtuple
+from datetime import datetime
+from functools import partial
+from typing import Callable, List, Tuple
+
+import vega_sim.api.governance as governance
+from vega_sim.api.helpers import num_to_padded_int
 from vega_sim.service import VegaService, PeggedOrder
+
+import metrics
+import timing
 from actions.vega import submit_multiple_orders, submit_order, submit_liquidity
+from actions import lookup
+from actions.utils import faucet_mint, provision_parties, settle
 
 
 import logging
@@ -21,6 +32,19 @@ mint_amount: float = 10e5
 market_name = "BTC:DAI_2023"
 
 
+# Market states a spec can ask for, in the order a market goes through them
+SIMPLE = "simple"
+OPENING_AUCTION = "opening_auction"
+CONTINUOUS = "continuous"
+
+MarketSpec = namedtuple(
+    "MarketSpec",
+    ["name", "state", "approve_proposal"],
+    defaults=[CONTINUOUS, True],
+)
+
+
+@timing.timed("market_setup")
 def setup_simple_market(
     vega: VegaService,
     approve_proposal=True,
@@ -28,71 +52,214 @@ def setup_simple_market(
     custom_asset_name="tDAI",
     custom_asset_symbol="tDAI",
 ):
-    for wallet in wallets:
-        vega.create_key(wallet.name)
+    return setup_markets(
+        vega,
+        [MarketSpec(custom_market_name, SIMPLE, approve_proposal)],
+        custom_asset_name=custom_asset_name,
+        custom_asset_symbol=custom_asset_symbol,
+    )[0]
+
+
+# Creates every market in `specs` on one asset and one set of funded keys.
+# The proposals, the opening auction orders and the uncrossing orders of all
+# markets are each sent together, so N markets take as many block advances as
+# one does.
+@timing.timed("market_setup")
+def setup_markets(
+    vega: VegaService,
+    specs: List[MarketSpec],
+    custom_asset_name="tDAI",
+    custom_asset_symbol="tDAI",
+) -> List[str]:
+    for spec in specs:
+        if spec.state != SIMPLE and not spec.approve_proposal:
+            raise ValueError(f"Market {spec.name} can't trade without approval")
+
+    # Funded once the asset exists, with the rest of the first level
+    provision_parties(vega, [wallet.name for wallet in wallets])
 
+    # Every proposal below needs the VOTE balance to be confirmed first
     vega.mint(
         MM_WALLET.name,
         asset="VOTE",
         amount=mint_amount,
     )
 
-    vega.update_network_parameter(
-        MM_WALLET.name, parameter="market.fee.factors.makerFee", new_value="0.1"
-    )
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
-
-    vega.create_asset(
-        MM_WALLET.name,
-        name=custom_asset_name,
-        symbol=custom_asset_symbol,
-        decimals=5,
-        max_faucet_amount=1e10,
+    run_level(
+        vega,
+        [
+            partial(
+                _propose_network_parameter,
+                vega,
+                parameter="market.fee.factors.makerFee",
+                new_value="0.1",
+            ),
+            partial(
+                _propose_asset,
+                vega,
+                name=custom_asset_name,
+                symbol=custom_asset_symbol,
+                decimals=5,
+                max_faucet_amount=1e10,
+            ),
+        ],
     )
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
-    tdai_id = vega.find_asset_id(symbol=custom_asset_symbol)
+    tdai_id = lookup.asset_id(vega, custom_asset_symbol)
     logger.info(f"Created asset: {custom_asset_symbol}")
 
-    vega.mint(
-        "Key 1",
-        asset=tdai_id,
-        amount=mint_amount,
+    # The mints and the market proposals only depend on the asset
+    results = run_level(
+        vega,
+        [
+            partial(_faucet, vega, "Key 1", tdai_id, mint_amount),
+            partial(_faucet, vega, MM_WALLET.name, tdai_id, mint_amount),
+            partial(_faucet, vega, MM_WALLET2.name, tdai_id, mint_amount),
+        ]
+        + [
+            partial(
+                _propose_market,
+                vega,
+                spec.name,
+                settlement_asset_id=tdai_id,
+                approve_proposal=spec.approve_proposal,
+            )
+            for spec in specs
+        ],
+    )
+    market_ids = results[3:]
+
+    in_auction = [
+        market_id
+        for market_id, spec in zip(market_ids, specs)
+        if spec.state in (OPENING_AUCTION, CONTINUOUS)
+    ]
+    for market_id in in_auction:
+        _submit_opening_orders(vega, market_id, wait=False)
+    if in_auction:
+        settle(vega)
+
+    continuous = [
+        market_id
+        for market_id, spec in zip(market_ids, specs)
+        if spec.state == CONTINUOUS
+    ]
+    for market_id in continuous:
+        submit_order(vega, "Key 1", market_id, "SIDE_BUY", 1, 110, wait=False)
+    if continuous:
+        settle(vega, duration="10s")
+
+    return market_ids
+
+
+def _submit_opening_orders(vega: VegaService, market_id: str, wait: bool = True):
+    submit_liquidity(vega, MM_WALLET.name, market_id)
+    submit_multiple_orders(
+        vega, MM_WALLET.name, market_id, "SIDE_SELL", [[1, 110], [1, 105]], wait
+    )
+    submit_multiple_orders(
+        vega, MM_WALLET2.name, market_id, "SIDE_BUY", [[1, 90], [1, 95]], wait
     )
 
-    vega.mint(
-        MM_WALLET.name,
-        asset=tdai_id,
-        amount=mint_amount,
+
+# Submits the transactions of one dependency level together. Each submission
+# returns its result and the chain time (in seconds) at which that result can
+# be used, e.g. a proposal's enactment, or None once its block is confirmed.
+# The chain is advanced once, to the latest of those times.
+def run_level(vega: VegaService, submissions: List[Callable[[], tuple]]) -> list:
+    results = []
+    ready_at = []
+    for submit in submissions:
+        result, ready = submit()
+        results.append(result)
+        if ready is not None:
+            ready_at.append(ready)
+    now = vega.get_blockchain_time(in_seconds=True)
+    # One more block after the latest enactment for it to take effect
+    duration = max(ready_at, default=now) - now + vega.seconds_per_block
+    settle(vega, duration=f"{max(duration, 0)}s")
+    metrics.increment("bootstrap.levels")
+    return results
+
+
+def _proposal_times(vega: VegaService) -> Tuple[int, int]:
+    # Same closing and enactment delays as vega_sim uses for its own proposals
+    now = vega.get_blockchain_time(in_seconds=True)
+    return now + vega.seconds_per_block * 40, now + vega.seconds_per_block * 50
+
+
+def _propose_network_parameter(vega: VegaService, parameter: str, new_value: str):
+    closing_time, enactment_time = _proposal_times(vega)
+    proposal_id = governance.propose_network_parameter_change(
+        parameter=parameter,
+        value=new_value,
+        key_name=MM_WALLET.name,
+        wallet=vega.wallet,
+        closing_time=closing_time,
+        enactment_time=enactment_time,
+        data_client=vega.trading_data_client_v2,
+        time_forward_fn=lambda: vega.wait_fn(2),
+    )
+    governance.approve_proposal(
+        key_name=MM_WALLET.name, proposal_id=proposal_id, wallet=vega.wallet
     )
+    return proposal_id, enactment_time
 
-    vega.mint(
-        MM_WALLET2.name,
-        asset=tdai_id,
-        amount=mint_amount,
+
+def _propose_asset(
+    vega: VegaService,
+    name: str,
+    symbol: str,
+    decimals: int,
+    max_faucet_amount: float,
+):
+    closing_time, enactment_time = _proposal_times(vega)
+    proposal_id = governance.propose_asset(
+        key_name=MM_WALLET.name,
+        wallet=vega.wallet,
+        name=name,
+        symbol=symbol,
+        decimals=decimals,
+        data_client=vega.trading_data_client_v2,
+        max_faucet_amount=num_to_padded_int(max_faucet_amount, decimals),
+        validation_time=closing_time - vega.seconds_per_block * 10,
+        closing_time=closing_time,
+        enactment_time=enactment_time,
+        time_forward_fn=lambda: vega.wait_fn(2),
+    )
+    governance.approve_proposal(
+        key_name=MM_WALLET.name, proposal_id=proposal_id, wallet=vega.wallet
     )
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    return proposal_id, enactment_time
+
 
+def _propose_market(
+    vega: VegaService,
+    name: str,
+    settlement_asset_id: str,
+    approve_proposal: bool = True,
+):
+    closing_time, enactment_time = _proposal_times(vega)
     market_id = vega.create_simple_market(
-        custom_market_name,
+        name,
         proposal_key=MM_WALLET.name,
-        settlement_asset_id=tdai_id,
+        settlement_asset_id=settlement_asset_id,
         termination_key=TERMINATE_WALLET.name,
         market_decimals=5,
+        vote_closing_time=datetime.fromtimestamp(closing_time),
+        vote_enactment_time=datetime.fromtimestamp(enactment_time),
         approve_proposal=approve_proposal,
-        forward_time_to_enactment=approve_proposal,
+        forward_time_to_enactment=False,
     )
+    return market_id, enactment_time if approve_proposal else None
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
 
-    return market_id
+# The balance is confirmed with the rest of the level
+def _faucet(vega: VegaService, key_name: str, asset_id: str, amount: float):
+    faucet_mint(vega, lookup.public_key(vega, key_name), asset_id, amount)
+    return None, None
 
 
+@timing.timed("market_setup")
 def setup_simple_successor_market(
     vega: VegaService, parent_market_id, tdai_id, market_name, approve_proposal=True
 ):
@@ -117,40 +284,30 @@ def setup_simple_successor_market(
 
     submit_order(vega, "Key 1", market_id, "SIDE_BUY", 1, 110)
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega, duration="10s")
 
     return market_id
 
 
+@timing.timed("market_setup")
 def setup_opening_auction_market(vega: VegaService, market_id: str = None, **kwargs):
-    if market_id is None or market_id not in vega.all_markets():
+    if market_id is None or not lookup.market_exists(vega, market_id):
         market_id = setup_simple_market(vega, **kwargs)
 
-    submit_liquidity(vega, MM_WALLET.name, market_id)
-    submit_multiple_orders(
-        vega, MM_WALLET.name, market_id, "SIDE_SELL", [[1, 110], [1, 105]]
-    )
-    submit_multiple_orders(
-        vega, MM_WALLET2.name, market_id, "SIDE_BUY", [[1, 90], [1, 95]]
-    )
+    _submit_opening_orders(vega, market_id)
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     return market_id
 
 
+@timing.timed("market_setup")
 def setup_continuous_market(vega: VegaService, market_id: str = None, **kwargs):
-    if market_id is None or market_id not in vega.all_markets():
+    if market_id is None or not lookup.market_exists(vega, market_id):
         market_id = setup_opening_auction_market(vega, **kwargs)
 
     submit_order(vega, "Key 1", market_id, "SIDE_BUY", 1, 110)
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega, duration="10s")
 
     return market_id
@@ -0,0 +1,70 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List
+
+# Per-process counters and timings. xdist workers hand theirs to the controller
+# through workeroutput and the totals are printed in the terminal summary.
+_counters: Dict[str, float] = defaultdict(float)
+_timings: Dict[str, List[float]] = defaultdict(list)
+
+
+def increment(name: str, value: float = 1):
+    _counters[name] += value
+
+
+def observe(name: str, seconds: float):
+    _timings[name].append(seconds)
+
+
+@contextmanager
+def timer(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def snapshot() -> dict:
+    return {
+        "counters": dict(_counters),
+        "timings": {name: list(values) for name, values in _timings.items()},
+    }
+
+
+def merge(snapshots: List[dict]) -> dict:
+    counters = defaultdict(float)
+    timings = defaultdict(list)
+    for snap in snapshots:
+        for name, value in snap["counters"].items():
+            counters[name] += value
+        for name, values in snap["timings"].items():
+            timings[name].extend(values)
+    return {"counters": dict(counters), "timings": dict(timings)}
+
+
+def summary_lines(snap: dict) -> List[str]:
+    lines = []
+    for name, value in sorted(snap["counters"].items()):
+        lines.append(f"{name}: {value:g}")
+    # Hit rate of every cache counting "<prefix>.hit*" and "<prefix>.miss"
+    for name, misses in sorted(snap["counters"].items()):
+        if not name.endswith(".miss"):
+            continue
+        prefix = name[: -len("miss")]
+        hits = sum(
+            value
+            for hit_name, value in snap["counters"].items()
+            if hit_name.startswith(prefix + "hit")
+        )
+        if hits + misses:
+            lines.append(f"{prefix}hit_rate: {hits / (hits + misses):.1%}")
+    for name, values in sorted(snap["timings"].items()):
+        if not values:
+            continue
+        lines.append(
+            f"{name}: n={len(values)} total={sum(values):.2f}s"
+            f" mean={sum(values) / len(values):.3f}s max={max(values):.3f}s"
+        )
+    return lines
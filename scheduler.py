@@ -0,0 +1,73 @@
+import heapq
+import statistics
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, List
+
+from xdist.scheduler import LoadFileScheduling
+
+import timing
+
+# Cost of a test that has never been recorded, when nothing has been recorded
+DEFAULT_TEST_COST = 30.0
+
+
+# Longest-processing-time-first scheduling of test files. Files stay whole, so
+# module-scoped vega and page fixtures are still set up once per file. Their
+# cost is the sum of the mean recorded duration of their tests (see timing.py),
+# fixture setup included, and whenever a worker runs low on work it gets the
+# most expensive file left, which is LPT list scheduling.
+class LPTScheduling(LoadFileScheduling):
+    def __init__(self, config, log=None):
+        super().__init__(config, log)
+        self.test_costs = timing.test_costs()
+        self.default_cost = (
+            statistics.median(self.test_costs.values())
+            if self.test_costs
+            else DEFAULT_TEST_COST
+        )
+        self.predicted_makespan = None
+        self.started = None
+        self.finished = None
+        self.busy: Dict[str, float] = defaultdict(float)
+
+    def scope_cost(self, scope: str) -> float:
+        return sum(
+            self.test_costs.get(nodeid, self.default_cost)
+            for nodeid in self.workqueue.get(scope, {})
+        )
+
+    def _assign_work_unit(self, node):
+        if self.started is None:
+            self.started = time.perf_counter()
+            self.predicted_makespan = predict_makespan(
+                [self.scope_cost(scope) for scope in self.workqueue], len(self.nodes)
+            )
+        self.workqueue = OrderedDict(
+            sorted(self.workqueue.items(), key=lambda item: -self.scope_cost(item[0]))
+        )
+        super()._assign_work_unit(node)
+
+    def mark_test_complete(self, node, item_index, duration=0):
+        self.busy[node.gateway.id] += duration
+        self.finished = time.perf_counter()
+        super().mark_test_complete(node, item_index, duration)
+
+    def summary_lines(self) -> List[str]:
+        if self.started is None or self.finished is None:
+            return []
+        lines = [
+            f"scheduler.predicted_makespan: {self.predicted_makespan:.1f}s",
+            f"scheduler.actual_makespan: {self.finished - self.started:.1f}s",
+        ]
+        for worker, seconds in sorted(self.busy.items()):
+            lines.append(f"scheduler.busy.{worker}: {seconds:.1f}s")
+        return lines
+
+
+# Makespan of assigning the costs, longest first, to the least loaded worker
+def predict_makespan(costs: List[float], workers: int) -> float:
+    loads = [0.0] * max(1, workers)
+    for cost in sorted(costs, reverse=True):
+        heapq.heappush(loads, heapq.heappop(loads) + cost)
+    return max(loads)
@@ -4,7 +4,7 @@ from vega_sim.service import VegaService
 from datetime import datetime, timedelta
 from conftest import init_vega
 from fixtures.market import setup_continuous_market
-from actions.utils import wait_for_toast_confirmation
+from actions.utils import wait_for_toast_confirmation, settle
 
 order_size = "order-size"
 order_price = "order-price"
@@ -44,9 +44,7 @@ def test_limit_buy_order_GTT(continuous_market, vega: VegaService, page: Page):
     )
     page.get_by_test_id(place_order).click()
     wait_for_toast_confirmation(page)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     page.get_by_test_id("All").click()
     # 7002-SORD-017
     expect(page.get_by_role("row").nth(2)).to_contain_text(
@@ -62,9 +60,7 @@ def test_limit_buy_order(continuous_market, vega: VegaService, page: Page):
     page.get_by_test_id(order_price).fill("120")
     page.get_by_test_id(place_order).click()
     wait_for_toast_confirmation(page)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     page.get_by_test_id("All").click()
     # 7002-SORD-017
     expect(page.get_by_role("row").nth(2)).to_contain_text(
@@ -88,9 +84,7 @@ def test_limit_sell_order(continuous_market, vega: VegaService, page: Page):
     )
     page.get_by_test_id(place_order).click()
     wait_for_toast_confirmation(page)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     page.get_by_test_id("All").click()
     expect(page.get_by_role("row").nth(2)).to_contain_text(
         "BTC:DAI_2023Futr10-10LimitFilled100.00GFN"
@@ -112,9 +106,7 @@ def test_market_sell_order(continuous_market, vega: VegaService, page: Page):
     )
     page.get_by_test_id(place_order).click()
     wait_for_toast_confirmation(page)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     
     page.get_by_test_id("All").click()
     expect(page.get_by_role("row").nth(2)).to_contain_text(
@@ -130,9 +122,7 @@ def test_market_buy_order(continuous_market, vega: VegaService, page: Page):
     page.get_by_test_id(tif).select_option("Fill or Kill (FOK)")
     page.get_by_test_id(place_order).click()
     wait_for_toast_confirmation(page)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     page.get_by_test_id("All").click()
     # 7002-SORD-010
     # 0003-WTXN-012
@@ -3,6 +3,7 @@ from collections import namedtuple
 from playwright.sync_api import Page, expect
 from vega_sim.service import VegaService
 from actions.vega import submit_order
+from actions.utils import settle, expect_graphql_response
 from datetime import datetime, timedelta
 from conftest import init_vega
 from fixtures.market import setup_continuous_market
@@ -48,38 +49,10 @@ updatedAt_col = '[col-id="updatedAt"]'
 close_toast = "toast-close"
 
 
-def wait_for_graphql_response(page, query_name, timeout=5000):
-    response_data = {}
-
-    def handle_response(route, request):
-        if "graphql" in request.url:
-            response = request.response()
-            if response is not None:
-                json_response = response.json()
-                if json_response and "data" in json_response:
-                    data = json_response["data"]
-                    if query_name in data:
-                        response_data["data"] = data
-                        route.continue_()
-                        return
-        route.continue_()
-
-    # Register the route handler
-    page.route("**", handle_response)
-
-    # Wait for the response data to be populated
-    page.wait_for_timeout(timeout)
-
-    # Unregister the route handler
-    page.unroute("**", handle_response)
-
-
 def create_position(vega: VegaService, market_id):
     submit_order(vega, "Key 1", market_id, "SIDE_SELL", 100, 110)
     submit_order(vega, "Key 1", market_id, "SIDE_BUY", 100, 110)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup
+    settle(vega)
 
 @pytest.mark.usefixtures("page", "continuous_market", "auth", "risk_accepted")
 def test_stop_order_form_error_validation(continuous_market, page: Page):
@@ -114,11 +87,9 @@ def test_submit_stop_order_rejected(continuous_market, vega: VegaService, page:
     page.get_by_test_id(trigger_price).fill("103")
     page.get_by_test_id(order_size).fill("3")
     page.get_by_test_id(submit_stop_order).click()
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
-    page.get_by_test_id(close_toast).click()
-    wait_for_graphql_response(page, "stopOrders")
+    with expect_graphql_response(page, "stopOrders"):
+        settle(vega)
+        page.get_by_test_id(close_toast).click()
     page.get_by_role(row_table).locator(market_name_col).nth(1).is_visible()
     expect((page.get_by_role(row_table).locator(market_name_col)).nth(1)).to_have_text(
         "BTC:DAI_2023Futr"
@@ -169,12 +140,10 @@ def test_submit_stop_market_order_triggered(
     page.get_by_test_id("date-picker-field").fill(expires_at_input_value)
     page.get_by_test_id(expiry_strategy_cancel).click()
     page.get_by_test_id(submit_stop_order).click()
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
-    page.wait_for_selector('[data-testid="toast-close"]', state="visible")
-    page.get_by_test_id(close_toast).click()
-    wait_for_graphql_response(page, "stopOrders")
+    with expect_graphql_response(page, "stopOrders"):
+        settle(vega)
+        page.wait_for_selector('[data-testid="toast-close"]', state="visible")
+        page.get_by_test_id(close_toast).click()
 
     page.get_by_role(row_table).locator(market_name_col).nth(1).is_visible()
     expect((page.get_by_role(row_table).locator(market_name_col)).nth(1)).to_have_text(
@@ -229,13 +198,10 @@ def test_submit_stop_limit_order_pending(
     expires_at_input_value = expires_at.strftime("%Y-%m-%dT%H:%M:%S")
     page.get_by_test_id("date-picker-field").fill(expires_at_input_value)
     page.get_by_test_id(submit_stop_order).click()
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
-
-    page.wait_for_selector('[data-testid="toast-close"]', state="visible")
-    page.get_by_test_id(close_toast).click()
-    wait_for_graphql_response(page, "stopOrders")
+    with expect_graphql_response(page, "stopOrders"):
+        settle(vega)
+        page.wait_for_selector('[data-testid="toast-close"]', state="visible")
+        page.get_by_test_id(close_toast).click()
     page.get_by_role(row_table).locator(market_name_col).nth(1).is_visible()
     expect((page.get_by_role(row_table).locator(market_name_col)).nth(1)).to_have_text(
         "BTC:DAI_2023Futr"
@@ -282,16 +248,11 @@ def test_submit_stop_limit_order_cancel(
     page.get_by_test_id(order_price).fill("99")
     page.get_by_test_id(order_size).fill("1")
     page.get_by_test_id(submit_stop_order).click()
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
-
-    page.get_by_test_id(close_toast).first.click()
-    wait_for_graphql_response(page, "stopOrders")
+    with expect_graphql_response(page, "stopOrders"):
+        settle(vega)
+        page.get_by_test_id(close_toast).first.click()
     page.get_by_test_id(cancel).click()
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     page.get_by_test_id(close_toast).first.click()
 
     expect(
@@ -404,12 +365,10 @@ class TestStopOcoValidation:
             page.get_by_test_id(order_price).fill("99")
             page.get_by_test_id(order_size).fill("1")
             page.get_by_test_id(submit_stop_order).click()
-            vega.forward("10s")
-            vega.wait_fn(1)
-            vega.wait_for_total_catchup()
-            if page.get_by_test_id(close_toast).is_visible():
-                page.get_by_test_id(close_toast).click()
-            wait_for_graphql_response(page, "stopOrders")
+            with expect_graphql_response(page, "stopOrders"):
+                settle(vega)
+                if page.get_by_test_id(close_toast).is_visible():
+                    page.get_by_test_id(close_toast).click()
         # 7002-SORD-011
         expect(page.get_by_test_id("stop-order-warning-limit")).to_have_text(
             "There is a limit of 4 active stop orders per market. Orders submitted above the limit will be immediately rejected."
@@ -6,7 +6,7 @@ from vega_sim.service import VegaService
 from actions.vega import submit_order
 from conftest import init_vega, page
 from fixtures.market import setup_continuous_market
-from actions.utils import wait_for_toast_confirmation
+from actions.utils import wait_for_toast_confirmation, settle, expect_graphql_response
 
 # Defined namedtuples
 WalletConfig = namedtuple("WalletConfig", ["name", "passphrase"])
@@ -55,38 +55,10 @@ order_size_oco = "order-size-oco"
 order_limit_price_oco = "order-price-oco"
 
 
-def wait_for_graphql_response(page, query_name, timeout=5000):
-    response_data = {}
-
-    def handle_response(route, request):
-        if "graphql" in request.url:
-            response = request.response()
-            if response is not None:
-                json_response = response.json()
-                if json_response and "data" in json_response:
-                    data = json_response["data"]
-                    if query_name in data:
-                        response_data["data"] = data
-                        route.continue_()
-                        return
-        route.continue_()
-
-    # Register the route handler
-    page.route("**", handle_response)
-
-    # Wait for the response data to be populated
-    page.wait_for_timeout(timeout)
-
-    # Unregister the route handler
-    page.unroute("**", handle_response)
-
-
 def create_position(vega: VegaService, market_id):
     submit_order(vega, "Key 1", market_id, "SIDE_SELL", 100, 110)
     submit_order(vega, "Key 1", market_id, "SIDE_BUY", 100, 110)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup
+    settle(vega)
 
 
 @pytest.mark.usefixtures("page", "vega", "continuous_market", "auth", "risk_accepted")
@@ -95,8 +67,8 @@ def test_submit_stop_order_market_oco_rejected(
 ):
     market_id = continuous_market
     page.goto(f"/#/markets/{market_id}")
-    page.get_by_test_id(stop_orders_tab).click()
-    wait_for_graphql_response(page, "stopOrders")
+    with expect_graphql_response(page, "stopOrders"):
+        page.get_by_test_id(stop_orders_tab).click()
     page.get_by_test_id(stop_order_btn).click()
     page.get_by_test_id(stop_market_order_btn).is_visible()
     page.get_by_test_id(stop_market_order_btn).click()
@@ -116,12 +88,9 @@ def test_submit_stop_order_market_oco_rejected(
     page.get_by_test_id(order_size_oco).fill("3")
     page.get_by_test_id(submit_stop_order).click()
     wait_for_toast_confirmation(page)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
-
-    page.get_by_test_id(close_toast).click()
-    wait_for_graphql_response(page, "stopOrders")
+    with expect_graphql_response(page, "stopOrders"):
+        settle(vega)
+        page.get_by_test_id(close_toast).click()
     page.get_by_role(row_table).locator(market_name_col).nth(1).is_visible()
 
     expect((page.get_by_role(row_table).locator(market_name_col)).nth(1)).to_have_text(
@@ -178,9 +147,9 @@ def test_submit_stop_oco_market_order_triggered(
 ):
     market_id = continuous_market
     page.goto(f"/#/markets/{market_id}")
-    page.get_by_test_id(stop_orders_tab).click()
-    create_position(vega, market_id)
-    wait_for_graphql_response(page, "stopOrders")
+    with expect_graphql_response(page, "stopOrders"):
+        page.get_by_test_id(stop_orders_tab).click()
+        create_position(vega, market_id)
     page.get_by_test_id(stop_order_btn).click()
     page.get_by_test_id(stop_market_order_btn).is_visible()
     page.get_by_test_id(stop_market_order_btn).click()
@@ -198,12 +167,9 @@ def test_submit_stop_oco_market_order_triggered(
     page.get_by_test_id(order_size_oco).fill("3")
     page.get_by_test_id(submit_stop_order).click()
     wait_for_toast_confirmation(page)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
-
-    page.get_by_test_id(close_toast).click()
-    wait_for_graphql_response(page, "stopOrders")
+    with expect_graphql_response(page, "stopOrders"):
+        settle(vega)
+        page.get_by_test_id(close_toast).click()
     page.get_by_role(row_table).locator(market_name_col).nth(1).is_visible()
 
     expect((page.get_by_role(row_table).locator(market_name_col)).nth(1)).to_have_text(
@@ -260,9 +226,9 @@ def test_submit_stop_oco_market_order_pending(
 ):
     market_id = continuous_market
     page.goto(f"/#/markets/{market_id}")
-    page.get_by_test_id(stop_orders_tab).click()
-    create_position(vega, market_id)
-    wait_for_graphql_response(page, "stopOrders")
+    with expect_graphql_response(page, "stopOrders"):
+        page.get_by_test_id(stop_orders_tab).click()
+        create_position(vega, market_id)
     page.get_by_test_id(stop_order_btn).click()
     page.get_by_test_id(stop_market_order_btn).is_visible()
     page.get_by_test_id(stop_market_order_btn).click()
@@ -276,11 +242,9 @@ def test_submit_stop_oco_market_order_pending(
     page.get_by_test_id(order_size_oco).fill("2")
     page.get_by_test_id(submit_stop_order).click()
     wait_for_toast_confirmation(page)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
-    page.get_by_test_id(close_toast).click()
-    wait_for_graphql_response(page, "stopOrders")
+    with expect_graphql_response(page, "stopOrders"):
+        settle(vega)
+        page.get_by_test_id(close_toast).click()
     page.get_by_role(row_table).locator(market_name_col).nth(1).is_visible()
 
     expect((page.get_by_role(row_table).locator(status_col)).nth(1)).to_have_text(
@@ -297,9 +261,9 @@ def test_submit_stop_oco_limit_order_pending(
 ):
     market_id = continuous_market
     page.goto(f"/#/markets/{market_id}")
-    page.get_by_test_id(stop_orders_tab).click()
-    create_position(vega, market_id)
-    wait_for_graphql_response(page, "stopOrders")
+    with expect_graphql_response(page, "stopOrders"):
+        page.get_by_test_id(stop_orders_tab).click()
+        create_position(vega, market_id)
     page.get_by_test_id(stop_order_btn).click()
     page.get_by_test_id(stop_limit_order_btn).is_visible()
     page.get_by_test_id(stop_limit_order_btn).click()
@@ -317,12 +281,9 @@ def test_submit_stop_oco_limit_order_pending(
     page.get_by_test_id(order_limit_price_oco).fill("99")
     page.get_by_test_id(submit_stop_order).click()
     wait_for_toast_confirmation(page)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
-
-    page.get_by_test_id(close_toast).click()
-    wait_for_graphql_response(page, "stopOrders")
+    with expect_graphql_response(page, "stopOrders"):
+        settle(vega)
+        page.get_by_test_id(close_toast).click()
     page.get_by_role(row_table).locator(market_name_col).nth(1).is_visible()
 
     expect((page.get_by_role(row_table).locator(submission_type)).nth(1)).to_have_text(
@@ -352,9 +313,9 @@ def test_submit_stop_oco_limit_order_cancel(
 ):
     market_id = continuous_market
     page.goto(f"/#/markets/{market_id}")
-    page.get_by_test_id(stop_orders_tab).click()
-    create_position(vega, market_id)
-    wait_for_graphql_response(page, "stopOrders")
+    with expect_graphql_response(page, "stopOrders"):
+        page.get_by_test_id(stop_orders_tab).click()
+        create_position(vega, market_id)
     page.get_by_test_id(stop_order_btn).click()
     page.get_by_test_id(stop_limit_order_btn).is_visible()
     page.get_by_test_id(stop_limit_order_btn).click()
@@ -373,17 +334,12 @@ def test_submit_stop_oco_limit_order_cancel(
     page.get_by_test_id(order_limit_price_oco).fill("99")
     page.get_by_test_id(submit_stop_order).click()
     wait_for_toast_confirmation(page)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
-
-    page.get_by_test_id(close_toast).click()
-    wait_for_graphql_response(page, "stopOrders")
+    with expect_graphql_response(page, "stopOrders"):
+        settle(vega)
+        page.get_by_test_id(close_toast).click()
     page.get_by_test_id(cancel).first.click()
     wait_for_toast_confirmation(page)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     page.get_by_test_id(close_toast).first.click()
 
     expect(
@@ -468,9 +424,9 @@ class TestStopOcoValidation:
     ):
         market_id = continuous_market
         page.goto(f"/#/markets/{market_id}")
-        page.get_by_test_id(stop_orders_tab).click()
-        create_position(vega, market_id)
-        wait_for_graphql_response(page, "stopOrders")
+        with expect_graphql_response(page, "stopOrders"):
+            page.get_by_test_id(stop_orders_tab).click()
+            create_position(vega, market_id)
         page.get_by_test_id(stop_order_btn).click()
         page.get_by_test_id(stop_limit_order_btn).is_visible()
         page.get_by_test_id(stop_limit_order_btn).click()
@@ -486,12 +442,10 @@ class TestStopOcoValidation:
         for i in range(2):
             page.get_by_test_id(submit_stop_order).click()
             wait_for_toast_confirmation(page)
-            vega.forward("10s")
-            vega.wait_fn(1)
-            vega.wait_for_total_catchup()
-            if page.get_by_test_id(close_toast).is_visible():
-                page.get_by_test_id(close_toast).click()
-            wait_for_graphql_response(page, "stopOrders")
+            with expect_graphql_response(page, "stopOrders"):
+                settle(vega)
+                if page.get_by_test_id(close_toast).is_visible():
+                    page.get_by_test_id(close_toast).click()
         # 7002-SORD-011
         expect(page.get_by_test_id("stop-order-warning-limit")).to_have_text(
             "There is a limit of 4 active stop orders per market. Orders submitted above the limit will be immediately rejected."
@@ -1,11 +1,12 @@
 import pytest
 from playwright.sync_api import expect, Page
-import json
 from vega_sim.service import VegaService
 from fixtures.market import setup_simple_market
 from conftest import init_vega
+from environment.profiles import AUTH, apply_profile
 from collections import namedtuple
 from actions.vega import submit_order
+from actions.utils import settle
 import logging
 
 logger = logging.getLogger()
@@ -34,44 +35,11 @@ class TestGetStarted:
         expect(page.locator(".list-none")).to_contain_text(
             "1.Connect2.Deposit funds3.Open a position"
         )
-        DEFAULT_WALLET_NAME = "MarketSim"  # This is the default wallet name within VegaServiceNull and CANNOT be changed
-
-        # Calling get_keypairs will internally call _load_tokens for the given wallet
-        keypairs = vega.wallet.get_keypairs(DEFAULT_WALLET_NAME)
-        wallet_api_token = vega.wallet.login_tokens[DEFAULT_WALLET_NAME]
-
-        # Set token to localStorage so eager connect hook picks it up and immediately connects
-        wallet_config = json.dumps(
-            {
-                "token": f"VWT {wallet_api_token}",
-                "connector": "jsonRpc",
-                "url": f"http://localhost:{vega.wallet_port}",
-            }
-        )
-
-        storage_javascript = [
-            # Store wallet config so eager connection is initiated
-            f"localStorage.setItem('vega_wallet_config', '{wallet_config}');",
-            # Ensure wallet ris dialog doesnt show, otherwise eager connect wont work
-            "localStorage.setItem('vega_wallet_risk_accepted', 'true');",
-            # Ensure initial risk dialog doesnt show
-            "localStorage.setItem('vega_risk_accepted', 'true');",
-        ]
-        script = "".join(storage_javascript)
-        page.add_init_script(script)
+        apply_profile(page, vega, AUTH)
         page.reload()
 
         # Assert step 1 complete
         expect(page.get_by_test_id("icon-tick")).to_have_count(1)
-        env = json.dumps(
-            {
-                "VEGA_URL": f"http://localhost:{vega.data_node_rest_port}/graphql",
-                "VEGA_WALLET_URL": f"http://localhost:{vega.wallet_port}",
-            }
-        )
-        window_env = f"window._env_ = Object.assign({{}}, window._env_, {env})"
-        page.add_init_script(script=window_env)
-
         page.reload()
 
         # Defined namedtuples
@@ -95,9 +63,7 @@ class TestGetStarted:
             amount=mint_amount,
         )
 
-        vega.forward("10s")
-        vega.wait_fn(1)
-        vega.wait_for_total_catchup()
+        settle(vega)
 
         vega.create_asset(
             MM_WALLET.name,
@@ -132,14 +98,10 @@ class TestGetStarted:
             forward_time_to_enactment=True,
         )
 
-        vega.forward("10s")
-        vega.wait_fn(1)
-        vega.wait_for_total_catchup()
+        settle(vega)
 
         submit_order(vega, "Key 1", market_id, "SIDE_BUY", 1, 110)
-        vega.forward("10s")
-        vega.wait_fn(1)
-        vega.wait_for_total_catchup()
+        settle(vega)
         page.get_by_test_id("get-started-button").click()
         # Assert dialog isn't visible
         expect(page.get_by_test_id("welcome-dialog")).not_to_be_visible()
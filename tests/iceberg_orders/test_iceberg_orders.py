@@ -3,6 +3,7 @@ from collections import namedtuple
 from playwright.sync_api import expect, Page
 from vega_sim.service import VegaService
 from actions.vega import submit_order
+from actions.utils import settle
 from conftest import init_vega
 from fixtures.market import setup_continuous_market
 
@@ -48,9 +49,7 @@ class TestIcebergOrdersValidations:
             "Awaiting confirmationPlease wait for your transaction to be confirmedView in block explorer"
         )
 
-        vega.forward("10s")
-        vega.wait_fn(1)
-        vega.wait_for_total_catchup()
+        settle(vega)
         expect(page.get_by_test_id("toast-content")).to_have_text(
             "Order filledYour transaction has been confirmed View in block explorerSubmit order - filledBTC:DAI_2023+3 @ 107.00 tDAI"
         )
@@ -106,9 +105,7 @@ def test_iceberg_open_order(continuous_market, vega: VegaService, page: Page):
     page.goto(f"/#/markets/{continuous_market}")
 
     submit_order(vega, "Key 1", continuous_market, "SIDE_SELL", 102, 101, 2, 1)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     page.wait_for_selector(".ag-center-cols-container .ag-row")
     expect(
@@ -139,9 +136,7 @@ def test_iceberg_open_order(continuous_market, vega: VegaService, page: Page):
 
     submit_order(vega, MM_WALLET2.name, continuous_market, "SIDE_BUY", 103, 101)
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     expect(
         page.locator(
             '[data-testid="tab-open-orders"] .ag-center-cols-container .ag-row'
@@ -4,6 +4,7 @@ from collections import namedtuple
 from playwright.sync_api import Page, expect
 from vega_sim.service import VegaService, PeggedOrder
 from actions.vega import submit_order
+from actions.utils import settle
 
 import logging
 
@@ -120,9 +121,7 @@ def test_price_monitoring(simple_market, vega: VegaService, page: Page):
         page.get_by_test_id(liquidity_supplied).get_by_test_id(item_value)
     ).to_have_text("100.00 (>100%)")
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     expect(
         page.get_by_test_id(liquidity_supplied).get_by_test_id(item_value)
     ).to_have_text("50.00 (>100%)")
@@ -163,9 +162,7 @@ def test_price_monitoring(simple_market, vega: VegaService, page: Page):
     # add order at the current price so that it is possible to change the status to price monitoring
     to_cancel = submit_order(vega, MM_WALLET2.name, simple_market, "SIDE_BUY", 1, 105)
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup() 
+    settle(vega)
     expect(
         page.get_by_test_id(price_monitoring_bounds_row).first.get_by_text(
             "135.44204 BTC"
@@ -189,9 +186,7 @@ def test_price_monitoring(simple_market, vega: VegaService, page: Page):
     # cancel order to increase liquidity
     vega.cancel_order(MM_WALLET2.name, simple_market, to_cancel)
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     expect(page.get_by_text(market_name).first).to_be_attached()
     expect(
@@ -3,8 +3,10 @@ import pytest
 from playwright.sync_api import Page, expect
 from vega_sim.service import VegaService
 from fixtures.market import setup_continuous_market
+from actions.grid import read_key_values, until_stable
 
-from conftest import init_page, init_vega, risk_accepted_setup
+from conftest import init_page, init_vega
+from environment import profiles
 
 market_title_test_id = "accordion-title"
 
@@ -18,9 +20,8 @@ def vega():
 # setting up everything in this single fixture, as all of the tests need the same setup, so no point in creating separate ones
 @pytest.fixture(scope="module")
 def page(vega, browser, request):
-    with init_page(vega, browser, request) as page:
+    with init_page(vega, browser, request, profile=profiles.RISK_ACCEPTED) as page:
         setup_continuous_market(vega)
-        risk_accepted_setup(page)
         page.goto("/")
         page.get_by_test_id("Info").click()
         yield page
@@ -35,14 +36,14 @@ def after_each(page: Page):
 
 
 def validate_info_section(page: Page, fields: [[str, str]]):
-    for rowNumber, field in enumerate(fields):
-        name, value = field
-        expect(
-            page.get_by_test_id("key-value-table-row").nth(rowNumber).locator("dt")
-        ).to_contain_text(name)
-        expect(
-            page.get_by_test_id("key-value-table-row").nth(rowNumber).locator("dd")
-        ).to_contain_text(value)
+    def check(rows):
+        assert len(rows) >= len(fields), rows
+        for (name, value), (actual_name, actual_value) in zip(fields, rows):
+            assert name in actual_name, f"{name} not in {actual_name}"
+            assert value in actual_value, f"{value} not in {actual_value}"
+
+    page.get_by_test_id("key-value-table-row").first.wait_for(state="visible")
+    until_stable(page, lambda: read_key_values(page), check)
 
 
 def test_market_info_current_fees(page: Page):
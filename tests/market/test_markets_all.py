@@ -1,6 +1,6 @@
 import pytest
 from playwright.sync_api import Page, expect
-from fixtures.market import setup_continuous_market
+from fixtures.market import MarketSpec, setup_markets
 
 from conftest import init_vega
 
@@ -15,8 +15,7 @@ def vega():
 
 @pytest.fixture(scope="module")
 def create_markets(vega):
-    for market_name in market_names:
-        setup_continuous_market(vega, custom_market_name=market_name)
+    setup_markets(vega, [MarketSpec(market_name) for market_name in market_names])
 
 
 @pytest.mark.usefixtures("risk_accepted")
@@ -2,7 +2,8 @@ import pytest
 from playwright.sync_api import Page, expect
 from vega_sim.service import VegaService
 
-from conftest import init_page, init_vega, risk_accepted_setup
+from conftest import init_page, init_vega
+from environment import profiles
 
 
 @pytest.fixture(scope="module")
@@ -13,8 +14,7 @@ def vega(request):
 
 @pytest.fixture(scope="module")
 def page(vega, browser, request):
-    with init_page(vega, browser, request) as page:
-        risk_accepted_setup(page)
+    with init_page(vega, browser, request, profile=profiles.RISK_ACCEPTED) as page:
         page.goto("/#/markets/all")
         yield page
 
@@ -6,7 +6,7 @@ from actions.vega import submit_order
 from fixtures.market import setup_simple_market
 from conftest import init_vega
 
-from actions.utils import wait_for_toast_confirmation
+from actions.utils import wait_for_toast_confirmation, settle
 
 
 # Defined namedtuples
@@ -68,9 +68,7 @@ def setup_market_monitoring_auction(vega: VegaService, simple_market):
     submit_order(vega,MM_WALLET.name,simple_market,"SIDE_SELL",1,1 + 0.1 / 2)
     submit_order(vega, MM_WALLET2.name, simple_market, "SIDE_SELL", 1, 1)
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega, duration="10s")
 
     # add orders that change the price so that it goes beyond the limits of price monitoring
     submit_order(vega, MM_WALLET.name, simple_market, "SIDE_SELL", 100, 110)
@@ -79,9 +77,7 @@ def setup_market_monitoring_auction(vega: VegaService, simple_market):
     submit_order(vega, MM_WALLET2.name, simple_market, "SIDE_BUY", 100, 95)
     submit_order(vega, MM_WALLET2.name, simple_market, "SIDE_BUY", 1, 105)
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
 @pytest.mark.usefixtures("page", "risk_accepted", "simple_market", "auth", "setup_market_monitoring_auction")
 def test_market_monitoring_auction_price_volatility_limit_order(page: Page, simple_market, vega: VegaService):
@@ -107,9 +103,7 @@ def test_market_monitoring_auction_price_volatility_limit_order(page: Page, simp
     page.get_by_test_id("place-order").click()
 
     wait_for_toast_confirmation(page)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     page.get_by_test_id("All").click()
     expect(page.get_by_role("row").nth(2)).to_contain_text(
         "BTC:DAI_2023Futr0+1LimitActive110.00GTC"
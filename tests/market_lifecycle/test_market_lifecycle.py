@@ -8,6 +8,7 @@ from vega_sim.service import VegaService, PeggedOrder
 import vega_sim.proto.vega as vega_protos
 import vega_sim.api.governance as governance
 from actions.vega import submit_order
+from actions.utils import settle
 from fixtures.market import setup_continuous_market
 from datetime import datetime
 from datetime import timedelta
@@ -92,9 +93,7 @@ def test_market_lifecycle(proposed_market, vega: VegaService, page: Page):
     submit_order(vega, MM_WALLET.name, market_id, "SIDE_SELL", 1, 100)
     submit_order(vega, MM_WALLET2.name, market_id, "SIDE_BUY", 1, 100)
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega, duration="10s")
 
     # check market state is now active and trading mode is continuous
     expect(trading_mode).to_have_text("Continuous")
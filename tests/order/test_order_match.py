@@ -1,7 +1,7 @@
 import pytest
-import re
 from playwright.sync_api import expect, Page
 from vega_sim.service import VegaService
+from actions.grid import verify_data_grid
 
 from playwright.sync_api import expect
 from actions.vega import submit_order
@@ -11,64 +11,6 @@ import logging
 logger = logging.getLogger()
 
 
-# Could be turned into a helper function in the future.
-def verify_data_grid(page, data_test_id, expected_pattern):
-    page.get_by_test_id(data_test_id).click()
-    # Required so that we can get liquidation price
-    if data_test_id == "Positions":
-        wait_for_graphql_response(page, "EstimatePosition")
-    expect(
-        page.locator(
-            f'[data-testid^="tab-{data_test_id.lower()}"] >> .ag-center-cols-container .ag-row-first'
-        )
-    ).to_be_visible()
-    actual_text = page.locator(
-        f'[data-testid^="tab-{data_test_id.lower()}"] >> .ag-center-cols-container .ag-row-first'
-    ).text_content()
-    lines = actual_text.strip().split("\n")
-    for expected, actual in zip(expected_pattern, lines):
-        # We are using regex so that we can run tests in different timezones.
-        if re.match(r"^\\d", expected):  # check if it's a regex
-            if re.search(expected, actual):
-                logger.info(f"Matched: {expected} == {actual}")
-            else:
-                logger.info(f"Not Matched: {expected} != {actual}")
-                raise AssertionError(f"Pattern does not match: {expected} != {actual}")
-        else:  # it's not a regex, so we escape it
-            if re.search(re.escape(expected), actual):
-                logger.info(f"Matched: {expected} == {actual}")
-            else:
-                logger.info(f"Not Matched: {expected} != {actual}")
-                raise AssertionError(f"Pattern does not match: {expected} != {actual}")
-
-
-# Required so that we can get liquidation price - Could also become a helper
-def wait_for_graphql_response(page, query_name, timeout=5000):
-    response_data = {}
-
-    def handle_response(route, request):
-        if "graphql" in request.url:
-            response = request.response()
-            if response is not None:
-                json_response = response.json()
-                if json_response and "data" in json_response:
-                    data = json_response["data"]
-                    if query_name in data:
-                        response_data["data"] = data
-                        route.continue_()
-                        return
-        route.continue_()
-
-    # Register the route handler
-    page.route("**", handle_response)
-
-    # Wait for the response data to be populated
-    page.wait_for_timeout(timeout)
-
-    # Unregister the route handler
-    page.unroute("**", handle_response)
-
-
 def submit_order(vega, wallet_name, market_id, side, volume, price):
     vega.submit_order(
         trading_key=wallet_name,
@@ -1,9 +1,10 @@
 import pytest
 from playwright.sync_api import Page, expect
 from vega_sim.service import VegaService, PeggedOrder
-from conftest import auth_setup, init_page, init_vega, risk_accepted_setup
-from fixtures.market import setup_continuous_market, setup_simple_market
-from actions.utils import wait_for_toast_confirmation
+from conftest import init_page, init_vega
+from environment import profiles
+from fixtures.market import MarketSpec, SIMPLE, setup_markets
+from actions.utils import wait_for_toast_confirmation, settle
 
 order_tab = "tab-orders"
 
@@ -16,25 +17,15 @@ def vega(request):
 
 @pytest.fixture(scope="module", autouse=True)
 def markets(vega: VegaService):
-    market_1 = setup_continuous_market(
+    market_1, market_2, market_3, market_4, market_5 = setup_markets(
         vega,
-        custom_market_name="market-1",
-    )
-    market_2 = setup_continuous_market(
-        vega,
-        custom_market_name="market-2",
-    )
-    market_3 = setup_continuous_market(
-        vega,
-        custom_market_name="market-3",
-    )
-    market_4 = setup_continuous_market(
-        vega,
-        custom_market_name="market-4",
-    )
-    market_5 = setup_simple_market(
-        vega,
-        custom_market_name="market-5",
+        [
+            MarketSpec("market-1"),
+            MarketSpec("market-2"),
+            MarketSpec("market-3"),
+            MarketSpec("market-4"),
+            MarketSpec("market-5", SIMPLE),
+        ],
     )
 
     vega.submit_order(
@@ -47,9 +38,7 @@ def markets(vega: VegaService):
         price=130,
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     vega.submit_order(
         trading_key="Key 1",
@@ -61,9 +50,7 @@ def markets(vega: VegaService):
         price=88,
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     vega.submit_order(
         trading_key="Key 1",
@@ -75,9 +62,7 @@ def markets(vega: VegaService):
         price=88,
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     vega.submit_order(
         trading_key="Key 1",
@@ -90,9 +75,7 @@ def markets(vega: VegaService):
         wait=False,
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     vega.submit_order(
         trading_key="Key 1",
@@ -103,9 +86,7 @@ def markets(vega: VegaService):
         volume=100,
         price=104,
     )
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     vega.submit_order(
         trading_key="Key 1",
@@ -118,9 +99,7 @@ def markets(vega: VegaService):
         expires_at=vega.get_blockchain_time() + 5 * 1e9,
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega, duration="10s")
 
     vega.submit_order(
         market_id=market_4,
@@ -132,9 +111,7 @@ def markets(vega: VegaService):
         volume=20,
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     vega.submit_order(
         market_id=market_4,
@@ -146,9 +123,7 @@ def markets(vega: VegaService):
         volume=40,
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     vega.submit_order(
         market_id=market_4,
@@ -160,9 +135,7 @@ def markets(vega: VegaService):
         volume=60,
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     vega.submit_order(
         market_id=market_5,
@@ -175,9 +148,7 @@ def markets(vega: VegaService):
         volume=60,
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     vega.submit_order(
         trading_key="Key 1",
@@ -189,9 +160,7 @@ def markets(vega: VegaService):
         price=150,
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     vega.submit_order(
         trading_key="Key 1",
@@ -203,9 +172,7 @@ def markets(vega: VegaService):
         price=160,
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     vega.submit_order(
         trading_key="Key 1",
@@ -217,16 +184,12 @@ def markets(vega: VegaService):
         price=60,
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
 
 @pytest.fixture(scope="module")
 def page(vega, browser, request):
-    with init_page(vega, browser, request) as page:
-        risk_accepted_setup(page)
-        auth_setup(vega, page)
+    with init_page(vega, browser, request, profile=profiles.profile_for([profiles.AUTH, profiles.RISK_ACCEPTED])) as page:
         page.goto("/")
         page.get_by_test_id("All").click()
         yield page
@@ -368,9 +331,7 @@ def test_order_amend_order(vega: VegaService, page: Page):
     page.get_by_role("button", name="Update").click()
 
     wait_for_toast_confirmation(page, timeout=5000)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     expect(page.get_by_test_id(order_tab)).to_contain_text(
         "market-2Futr" + "0" + "-15" + "Limit" + "Active" + "170.00" + "GTC"
@@ -385,9 +346,7 @@ def test_order_cancel_single_order(vega: VegaService, page: Page):
     page.get_by_test_id("cancel").first.click()
 
     wait_for_toast_confirmation(page, timeout=5000)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     expect(page.get_by_test_id(order_tab)).to_contain_text(
         "market-3Futr" + "0" + "+10" + "Limit" + "Cancelled" + "60.00" + "GTC"
@@ -403,9 +362,7 @@ def test_order_cancel_all_orders(vega: VegaService, page: Page):
     page.get_by_test_id("cancelAll").click()
 
     wait_for_toast_confirmation(page, timeout=5000)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     expect(page.get_by_test_id("cancelAll")).not_to_be_visible()
     expect(page.get_by_test_id("cancel")).not_to_be_visible()
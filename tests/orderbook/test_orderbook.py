@@ -1,9 +1,12 @@
 import pytest
+from functools import partial
 from collections import namedtuple
 from playwright.sync_api import Page, expect
 from vega_sim.service import VegaService
 from typing import List
 from actions.vega import submit_order, submit_liquidity, submit_multiple_orders
+from actions.grid import assert_cells_equal, numeric_rows, read_rows, until_stable
+from actions.utils import settle
 from conftest import init_vega
 from fixtures.market import setup_simple_market
 
@@ -40,9 +43,7 @@ def setup_market(vega):
         [[10, 69.995], [5, 70], [5, 85], [3, 90], [3, 95]],
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     return [
         vega,
@@ -72,11 +73,13 @@ orderbook_content = [
 def verify_orderbook_grid(
     page: Page, content: List[List[float]], last_trade_price: float = False
 ):
-    rows = page.locator("[data-testid$=-rows-container]").all()
-    for row_index, content_row in enumerate(content):
-        cells = rows[row_index].locator("button").all()
-        for cell_index, content_cell in enumerate(content_row):
-            assert float(cells[cell_index].text_content()) == content_cell
+    until_stable(
+        page,
+        lambda: numeric_rows(
+            read_rows(page, "[data-testid$=-rows-container]", "button")
+        ),
+        partial(assert_cells_equal, content),
+    )
 
 
 def verify_prices_descending(page: Page):
@@ -113,9 +116,7 @@ def test_orderbook_grid_content(setup_market, page: Page):
         matching_order[1],
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     # 6003-ORDB-001
     # 6003-ORDB-002
@@ -239,9 +240,7 @@ def test_orderbook_price_movement(setup_market, page: Page):
         matching_order_1[1],
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     # 6003-ORDB-013
     expect(book_el.locator("[data-testid=icon-arrow-up]")).to_be_attached()
@@ -260,9 +259,7 @@ def test_orderbook_price_movement(setup_market, page: Page):
         matching_order_2[1],
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     expect(book_el.locator("[data-testid=icon-arrow-down]")).to_be_attached()
 
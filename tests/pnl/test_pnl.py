@@ -2,32 +2,7 @@ import pytest
 from playwright.sync_api import Page
 from vega_sim.service import VegaService
 from actions.vega import submit_order
-
-
-def wait_for_graphql_response(page, query_name, timeout=5000):
-    response_data = {}
-
-    def handle_response(route, request):
-        if "graphql" in request.url:
-            response = request.response()
-            if response is not None:
-                json_response = response.json()
-                if json_response and "data" in json_response:
-                    data = json_response["data"]
-                    if query_name in data:
-                        response_data["data"] = data
-                        route.continue_()
-                        return
-        route.continue_()
-
-    # Register the route handler
-    page.route("**", handle_response)
-
-    # Wait for the response data to be populated
-    page.wait_for_timeout(timeout)
-
-    # Unregister the route handler
-    page.unroute("**", handle_response)
+from actions.utils import settle, expect_graphql_response
 
 
 def check_pnl_color_value(element, expected_color, expected_value):
@@ -40,9 +15,7 @@ def check_pnl_color_value(element, expected_color, expected_value):
 def test_pnl(continuous_market, vega: VegaService, page: Page):
     page.set_viewport_size({"width": 1748, "height": 977})
     submit_order(vega, "Key 1", continuous_market, "SIDE_BUY", 1, 104.50000)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     page.goto(f"/#/markets/{continuous_market}")
     # Loss Trading unrealised
     row = (
@@ -70,8 +43,8 @@ def test_pnl(continuous_market, vega: VegaService, page: Page):
     # Portfolio Unrealised
     page.get_by_test_id("manage-vega-wallet").click(force=True)
     page.get_by_role("link", name="Portfolio").click()
-    page.get_by_test_id("Positions").click()
-    wait_for_graphql_response(page, "EstimatePosition")
+    with expect_graphql_response(page, "EstimatePosition"):
+        page.get_by_test_id("Positions").click()
     page.wait_for_selector(
         '[data-testid="tab-positions"] .ag-center-cols-container .ag-row',
         state="visible",
@@ -103,10 +76,8 @@ def test_pnl(continuous_market, vega: VegaService, page: Page):
     check_pnl_color_value(key_mm2_unrealised_pnl, "rgb(0, 0, 0)", "0.00")
 
     submit_order(vega, "Key 1", continuous_market, "SIDE_SELL", 2, 101.50000)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
-    wait_for_graphql_response(page, "EstimatePosition")
+    with expect_graphql_response(page, "EstimatePosition"):
+        settle(vega)
 
     check_pnl_color_value(key_1_realised_pnl, "rgb(236, 0, 60)", "-8.00")
     check_pnl_color_value(key_1_unrealised_pnl, "rgb(0, 0, 0)", "0.00")
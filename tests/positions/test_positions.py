@@ -1,6 +1,7 @@
 import pytest
 from playwright.sync_api import Page, expect
 from vega_sim.service import VegaService
+from actions.utils import settle
 from fixtures.market import (
     setup_continuous_market,
 )
@@ -14,9 +15,7 @@ def test_closed_market_position(vega: VegaService, page: Page):
         settlement_price=110,
         market_id=market_id,
     )
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     page.goto(f"/#/markets/{market_id}")
     expect(page.locator(".ag-overlay-panel")).to_have_text("No positions")
     page.get_by_test_id("open-transfer").click()
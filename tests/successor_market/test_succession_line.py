@@ -1,6 +1,7 @@
 import pytest
 from playwright.sync_api import Page, expect
 from vega_sim.service import VegaService
+from actions.utils import settle
 from fixtures.market import setup_continuous_market, setup_simple_successor_market
 
 
@@ -17,9 +18,7 @@ def successor_market(vega: VegaService):
         settlement_price=110,
         market_id=parent_market_id,
     )
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     return successor_market_id
 
 
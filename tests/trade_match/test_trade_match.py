@@ -3,6 +3,7 @@ from playwright.sync_api import expect, Page
 from vega_sim.service import VegaService
 
 from actions.vega import submit_multiple_orders
+from actions.utils import settle
 
 @pytest.mark.skip("tbd")
 @pytest.mark.usefixtures(
@@ -24,9 +25,7 @@ def test_trade_match_table(opening_auction_market: str, vega: VegaService, page:
         wait=False,
     )
 
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     submit_multiple_orders(
         vega,
@@ -35,9 +34,7 @@ def test_trade_match_table(opening_auction_market: str, vega: VegaService, page:
         "SIDE_BUY",
         [[5, 110], [5, 105], [1, 50]],
     )
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
 
     submit_multiple_orders(
         vega,
@@ -2,7 +2,7 @@ import pytest
 import re
 from playwright.sync_api import Page, expect
 from vega_sim.service import VegaService
-from actions.utils import wait_for_toast_confirmation, create_and_faucet_wallet, WalletConfig, next_epoch
+from actions.utils import wait_for_toast_confirmation, provision_parties, WalletConfig, next_epoch, settle
 import vega_sim.proto.vega as vega_protos
 
 LIQ = WalletConfig("liq", "liq")
@@ -39,9 +39,7 @@ def test_transfer_submit(continuous_market, vega: VegaService, page: Page):
     
     page.locator('[data-testid=transfer-form] [type="submit"]').click()
     wait_for_toast_confirmation(page)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     expected_confirmation_text = re.compile(r"Transfer completeYour transaction has been confirmed View in block explorerTransferTo .{6}….{6}1\.00 tDAI")
     actual_confirmation_text = page.get_by_test_id('toast-content').text_content()
     assert expected_confirmation_text.search(actual_confirmation_text), f"Expected pattern not found in {actual_confirmation_text}"
@@ -54,10 +52,8 @@ def test_transfer_vesting_below_minimum(continuous_market, vega: VegaService, pa
     )
     vega.wait_for_total_catchup()
     
-    create_and_faucet_wallet(vega=vega, wallet=PARTY_A, amount=1e3)
-    create_and_faucet_wallet(vega=vega, wallet=PARTY_B, amount=1e5)
-    create_and_faucet_wallet(vega=vega, wallet=PARTY_C, amount=1e5)
-    vega.wait_for_total_catchup()
+    provision_parties(vega, [PARTY_A.name], assets={"tDAI": 1e3})
+    provision_parties(vega, [PARTY_B.name, PARTY_C.name], assets={"tDAI": 1e5})
 
     asset_id = vega.find_asset_id(symbol="tDAI")
     next_epoch(vega=vega)
@@ -92,8 +88,7 @@ def test_transfer_vesting_below_minimum(continuous_market, vega: VegaService, pa
         volume=100,
     )
     vega.wait_for_total_catchup()
-    next_epoch(vega=vega)
-    next_epoch(vega=vega)
+    next_epoch(vega=vega, epochs=2)
     page.goto('/#/portfolio')
     expect(page.get_by_test_id('transfer-form')).to_be_visible
     
@@ -126,9 +121,7 @@ def test_transfer_vesting_below_minimum(continuous_market, vega: VegaService, pa
     page.get_by_text("Use max").first.click()
     page.locator('[data-testid=transfer-form] [type="submit"]').click()
     wait_for_toast_confirmation(page)
-    vega.forward("10s")
-    vega.wait_fn(1)
-    vega.wait_for_total_catchup()
+    settle(vega)
     expected_confirmation_text = re.compile(r"Transfer completeYour transaction has been confirmed View in block explorerTransferTo .{6}….{6}0\.00001 tDAI")
     actual_confirmation_text = page.get_by_test_id('toast-content').text_content()
     assert expected_confirmation_text.search(actual_confirmation_text), f"Expected pattern not found in {actual_confirmation_text}"
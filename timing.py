@@ -0,0 +1,208 @@
+import argparse
+import functools
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from contextlib import closing, contextmanager
+from typing import Dict, List, Optional
+
+from config import console_image_name, timing_db
+
+# Per-test phase timings, stored in a SQLite database shared by all workers and
+# runs. Time spent in a nested phase is only counted for the innermost one, so
+# the phases of a test add up to its duration and whatever was not spent in an
+# instrumented phase is recorded as "<when>.other", e.g. UI waits in
+# "call.other". Phases are only recorded on the thread running the tests,
+# environments started in the background by the pool don't belong to a test.
+#
+# Report the most expensive phases with:
+#   python timing.py [--sha SHA] [--image IMAGE] [--limit N]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS phases (
+    recorded_at REAL NOT NULL,
+    nodeid TEXT NOT NULL,
+    git_sha TEXT NOT NULL,
+    console_image TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    seconds REAL NOT NULL
+)
+"""
+
+# Methods of VegaServiceNull that move or wait for the chain
+CHAIN_METHODS = [
+    "forward",
+    "wait_fn",
+    "wait_for_total_catchup",
+    "wait_for_core_catchup",
+    "wait_for_datanode_sync",
+]
+
+_when = "setup"
+_phases: Dict[str, float] = defaultdict(float)
+# Names of the phases currently running, innermost last, with the time spent in
+# their nested phases so far
+_stack: List[list] = []
+
+
+def _recording() -> bool:
+    return timing_db != "" and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def phase(name: str):
+    # Re-entering a phase, e.g. a setup function calling another one, keeps
+    # counting towards the outer call
+    if not _recording() or any(entry[0] == name for entry in _stack):
+        yield
+        return
+    entry = [name, 0.0]
+    _stack.append(entry)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _stack.pop()
+        _phases[f"{_when}.{name}"] += elapsed - entry[1]
+        if _stack:
+            _stack[-1][1] += elapsed
+
+
+def timed(name: str):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# Time the chain calls of a VegaServiceNull, whichever helper makes them
+def instrument(vega):
+    for name in CHAIN_METHODS:
+        setattr(vega, name, timed(f"chain.{name}")(getattr(vega, name)))
+
+
+def begin(when: str):
+    global _when
+    _when = when
+
+
+def finish(nodeid: str, durations: Dict[str, float]):
+    if not _recording():
+        return
+    phases = dict(_phases)
+    _phases.clear()
+    for when, duration in durations.items():
+        measured = sum(
+            seconds for name, seconds in phases.items() if name.startswith(when + ".")
+        )
+        phases[f"{when}.other"] = max(0.0, duration - measured)
+    recorded_at = time.time()
+    rows = [
+        (recorded_at, nodeid, git_sha(), console_image(), name, seconds)
+        for name, seconds in phases.items()
+    ]
+    with closing(_connect()) as db, db:
+        db.executemany("INSERT INTO phases VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+
+@functools.lru_cache(maxsize=None)
+def git_sha() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+@functools.lru_cache(maxsize=None)
+def console_image() -> str:
+    # Imported here so the report CLI runs without vega_sim or a Docker daemon
+    from environment.console import image_digest
+
+    try:
+        return f"{console_image_name}@{image_digest()}"
+    except Exception:
+        return console_image_name
+
+
+def _connect(path: str = timing_db) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Workers write at the end of every test, wait for each other's locks
+    db = sqlite3.connect(path, timeout=30)
+    db.execute(_SCHEMA)
+    return db
+
+
+# Mean seconds per run of every recorded test, all phases included
+def test_costs(path: str = timing_db) -> Dict[str, float]:
+    if not path or not os.path.exists(path):
+        return {}
+    with closing(_connect(path)) as db:
+        return dict(
+            db.execute(
+                """
+                SELECT nodeid, SUM(seconds) / COUNT(DISTINCT recorded_at)
+                FROM phases
+                GROUP BY nodeid
+                """
+            ).fetchall()
+        )
+
+
+def report(
+    path: str = timing_db,
+    sha: Optional[str] = None,
+    image: Optional[str] = None,
+    limit: int = 20,
+) -> List[tuple]:
+    filters, params = [], []
+    if sha is not None:
+        filters.append("git_sha = ?")
+        params.append(sha)
+    if image is not None:
+        filters.append("console_image LIKE ?")
+        params.append(f"{image}%")
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    with closing(_connect(path)) as db:
+        return db.execute(
+            f"""
+            SELECT phase, COUNT(DISTINCT nodeid), COUNT(*), SUM(seconds), AVG(seconds), MAX(seconds)
+            FROM phases {where}
+            GROUP BY phase
+            ORDER BY SUM(seconds) DESC
+            LIMIT ?
+            """,
+            params + [limit],
+        ).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top test phases by total time")
+    parser.add_argument("--db", default=timing_db)
+    parser.add_argument("--sha", help="only runs of this git commit")
+    parser.add_argument("--image", help="only runs of this console image")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    rows = report(args.db, args.sha, args.image, args.limit)
+    print(f"{'phase':40} {'tests':>6} {'n':>6} {'total':>10} {'mean':>8} {'max':>8}")
+    for name, tests, count, total, mean, longest in rows:
+        print(
+            f"{name:40} {tests:>6} {count:>6} {total:>9.1f}s {mean:>7.2f}s {longest:>7.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()